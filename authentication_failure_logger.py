@@ -5,17 +5,57 @@ References:
 
     Django (2023) [online] How to configure and use logging. Available at:
     https://docs.djangoproject.com/en/4.2/howto/logging/ (Accessed: 10 July 2023)
+
+    Throttled attempts raise PermissionDenied based on 'Writing an authentication backend' in django documentation:
+
+    Django (2023) [online] Customizing authentication in Django. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/auth/customizing/#writing-an-authentication-backend
+    (Accessed: 18 October 2026)
 """
 
+from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
 import logging
 
+import login_throttle
+from web_app.cache import get_cached_user
+
 logger = logging.getLogger(__name__)
 
 
 class AuthenticationFailureLoggerModelBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(self.get_user_model().USERNAME_FIELD)
+        remote_addr = login_throttle.client_ip(request)
+        # Checked before ModelBackend.authenticate so a throttled attempt never reaches the password hasher.
+        # django.contrib.auth.authenticate() turns PermissionDenied into a failed login, so the wait is also
+        # left on the request for the login view to answer with 429 and Retry-After.
+        wait = login_throttle.retry_after(request, username)
+        if wait:
+            login_throttle.mark_throttled(request, wait)
+            logger.warning("Throttled authentication attempt for username: %s", username,
+                           extra={"event": "authentication_throttled", "username": username,
+                                  "remote_addr": remote_addr})
+            raise PermissionDenied
         user = super().authenticate(request, username=username, password=password, **kwargs)
         if user is None:
-            logger.warning(f"Authentication failure for username: {username}")
+            login_throttle.record_failure(request, username)
+            logger.warning("Authentication failure for username: %s", username,
+                           extra={"event": "authentication_failure", "username": username,
+                                  "remote_addr": remote_addr})
+        else:
+            login_throttle.reset_username(username)
         return user
+
+    def get_user(self, user_id):
+        # Called by AuthenticationMiddleware on every request with a logged in session.
+        user = get_cached_user(user_id, self.load_user)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    def load_user(self, user_id):
+        try:
+            return get_user_model()._default_manager.get(pk=user_id)
+        except get_user_model().DoesNotExist:
+            return None
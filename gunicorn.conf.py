@@ -0,0 +1,71 @@
+"""
+References:
+
+    Multiprocess hooks based on the Prometheus Python client documentation:
+
+    Prometheus (2023) [online] Multiprocess Mode (E.g. Gunicorn). Available at:
+    https://prometheus.github.io/client_python/multiprocess/ (Accessed: 18 October 2026)
+
+    Worker sizing, preloading and recycling based on the Gunicorn documentation:
+
+    Gunicorn (2023) [online] Settings. Available at:
+    https://docs.gunicorn.org/en/stable/settings.html (Accessed: 18 October 2026)
+
+    Gunicorn (2023) [online] Design — How Many Workers? Available at:
+    https://docs.gunicorn.org/en/stable/design.html#how-many-workers (Accessed: 18 October 2026)
+"""
+
+import multiprocessing
+import os
+import shutil
+
+# Workers write their metrics here so /metrics served by any worker reports all of them. Must be set before
+# prometheus_client is imported, which happens when the application is loaded.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/web_app_prometheus")
+
+# Heroku sets WEB_CONCURRENCY from the dyno size; elsewhere start with (2 x cores) + 1.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Threads per sync worker; above 1 gunicorn switches to gthread workers. Ignored by the uvicorn worker.
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+# Import Django once in the master so workers fork with it, and with warm_up()'s templates and URLs, in place.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+
+# Restart each worker after about this many requests; the jitter keeps them from all restarting at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+warm_up = os.environ.get("GUNICORN_WARM_UP", "True") == "True"
+
+
+def on_starting(server):
+    # Files left by a previous master would be summed into this one's metrics.
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def when_ready(server):
+    if warm_up and server.cfg.preload_app:
+        from web_app.warmup import warm_up as warm_up_process
+
+        server.log.info("Warmed up master: %s", warm_up_process(database=False))
+
+
+def post_worker_init(worker):
+    # Without preload_app the application is only loaded once the worker has forked, so it is warmed here.
+    if warm_up:
+        from web_app.warmup import check_connections, warm_up as warm_up_process
+
+        if worker.cfg.preload_app:
+            # Connections cannot be inherited across fork(), and requests open their own in their sync threads.
+            worker.log.info("Checked %s databases", check_connections())
+        else:
+            worker.log.info("Warmed up worker: %s", warm_up_process())
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
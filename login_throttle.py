@@ -0,0 +1,160 @@
+"""
+References:
+
+    Sliding window counter based on 'Sliding window' in the Cloudflare blog:
+
+    Cloudflare (2017) [online] How we built rate limiting capable of scaling to millions of domains. Available at:
+    https://blog.cloudflare.com/counting-things-a-lot-of-different-things/ (Accessed: 18 October 2026)
+
+    Counters stored with cache.add()/cache.incr() based on django documentation:
+
+    Django (2023) [online] Django's cache framework. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/cache/#basic-usage (Accessed: 18 October 2026)
+
+    client_ip based on 'Selecting an IP address' in MDN Web Docs:
+
+    MDN (2023) [online] X-Forwarded-For. Available at:
+    https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/X-Forwarded-For#selecting_an_ip_address
+    (Accessed: 18 October 2026)
+"""
+
+import hashlib
+import ipaddress
+import math
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+
+USERNAME_SCOPE = "username"
+
+IP_SCOPE = "ip"
+
+
+def get_cache():
+    # Counters are only shared between workers when this cache is; in a per-process LocMemCache each worker counts
+    # its own failures, so a client gets up to the limit times the number of workers.
+    return caches[settings.LOGIN_THROTTLE_CACHE_ALIAS]
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """System check warning that the limits are enforced per process when the throttle's cache is LocMemCache."""
+    backend = settings.CACHES[settings.LOGIN_THROTTLE_CACHE_ALIAS]["BACKEND"]
+    if not backend.endswith("LocMemCache"):
+        return []
+    return [checks.Warning(
+        "Failed logins are counted in a per-process LocMemCache, so each worker enforces the login throttle "
+        "limits on its own.",
+        hint="Point CACHE_BACKEND, or LOGIN_THROTTLE_CACHE_ALIAS, at a cache shared between workers "
+             "(e.g. Redis or Memcached).",
+        id="login_throttle.W001",
+    )]
+
+
+def get_limits():
+    return {USERNAME_SCOPE: settings.LOGIN_THROTTLE_USERNAME_LIMIT, IP_SCOPE: settings.LOGIN_THROTTLE_IP_LIMIT}
+
+
+def client_ip(request):
+    """
+    Return the address of the client that sent request. Behind CLIENT_IP_TRUSTED_PROXIES reverse proxies, each of
+    which appends the address it received the request from to CLIENT_IP_HEADER, that is the entry the outermost
+    proxy appended: entries left of it were sent by the client and can be forged.
+    """
+    if request is None:
+        return None
+    remote_addr = request.META.get("REMOTE_ADDR")
+    proxies = settings.CLIENT_IP_TRUSTED_PROXIES
+    if not (settings.CLIENT_IP_HEADER and proxies):
+        return remote_addr
+    hops = [hop.strip() for hop in request.META.get(settings.CLIENT_IP_HEADER, "").split(",") if hop.strip()]
+    if len(hops) < proxies:
+        # Fewer hops than proxies: the request did not come through all of them.
+        return remote_addr
+    try:
+        return str(ipaddress.ip_address(hops[-proxies]))
+    except ValueError:
+        return remote_addr
+
+
+def identities(request, username):
+    """Return the (scope, value) pairs an attempt is counted against; usernames are case-insensitive."""
+    pairs = []
+    if username:
+        pairs.append((USERNAME_SCOPE, username.lower()))
+    ip = client_ip(request)
+    if ip:
+        pairs.append((IP_SCOPE, ip))
+    return pairs
+
+
+def bucket_key(scope, value, bucket):
+    digest = hashlib.md5(value.encode()).hexdigest()
+    return f"login:throttle:{scope}:{digest}:{bucket}"
+
+
+def retry_after(request, username, now=None):
+    """
+    Return the number of seconds until the next attempt for username from this client is allowed, or 0 if it is
+    allowed now. Failures are counted in fixed windows and the previous window's count is weighted by how much
+    of it still overlaps the sliding window, so the whole check is a single cache round trip.
+    """
+    pairs = identities(request, username)
+    if not pairs:
+        return 0
+    window = settings.LOGIN_THROTTLE_WINDOW
+    now = time.time() if now is None else now
+    bucket, offset = divmod(now, window)
+    bucket = int(bucket)
+    keys = {(scope, value): (bucket_key(scope, value, bucket), bucket_key(scope, value, bucket - 1))
+            for scope, value in pairs}
+    counts = get_cache().get_many([key for pair in keys.values() for key in pair])
+    limits = get_limits()
+    wait = 0
+    for (scope, value), (current_key, previous_key) in keys.items():
+        current = counts.get(current_key, 0)
+        previous = counts.get(previous_key, 0)
+        if current >= limits[scope]:
+            # The current window alone is over the limit: nothing drains until it closes.
+            wait = max(wait, window - offset)
+        elif current + previous * (1 - offset / window) >= limits[scope]:
+            # Wait until enough of the previous window has slid out to leave room for one more attempt.
+            remaining = window * (1 - (limits[scope] - current) / previous)
+            wait = max(wait, remaining - offset)
+    return math.ceil(wait) if wait > 0 else 0
+
+
+def mark_throttled(request, wait):
+    """Note on request that authentication was refused for wait seconds, for the view to answer with a 429."""
+    if request is not None:
+        request.login_retry_after = wait
+
+
+def throttled_for(request):
+    return getattr(request, "login_retry_after", 0)
+
+
+def record_failure(request, username, now=None):
+    window = settings.LOGIN_THROTTLE_WINDOW
+    now = time.time() if now is None else now
+    bucket = int(now // window)
+    cache = get_cache()
+    for scope, value in identities(request, username):
+        key = bucket_key(scope, value, bucket)
+        # add() then incr() keeps the count atomic on shared backends; a window's count is read for two windows.
+        cache.add(key, 0, timeout=2 * window)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=2 * window)
+
+
+def reset_username(username, now=None):
+    """Forget failures for username after a successful login; failures counted against the client IP remain."""
+    if not username:
+        return
+    window = settings.LOGIN_THROTTLE_WINDOW
+    now = time.time() if now is None else now
+    bucket = int(now // window)
+    get_cache().delete_many([bucket_key(USERNAME_SCOPE, username.lower(), b) for b in (bucket, bucket - 1)])
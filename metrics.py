@@ -0,0 +1,114 @@
+"""
+References:
+
+    Metrics based on the Prometheus Python client documentation:
+
+    Prometheus (2023) [online] Multiprocess Mode (E.g. Gunicorn). Available at:
+    https://prometheus.github.io/client_python/multiprocess/ (Accessed: 18 October 2026)
+
+    TimedDjangoTemplates based on 'Custom backends' in django documentation:
+
+    Django (2023) [online] Templates. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/templates/#custom-backends (Accessed: 18 October 2026)
+"""
+
+import os
+import time
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+                               generate_latest, multiprocess)
+
+# Seconds; request and template buckets reach past the 30s gunicorn timeout, DB buckets stop at 10s.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DB_DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REQUEST_COUNT = Counter("web_app_requests_total", "Requests by view, method and status.",
+                        ["view", "method", "status"])
+REQUEST_DURATION = Histogram("web_app_request_duration_seconds", "Time spent handling a request.",
+                             ["view", "method"], buckets=DURATION_BUCKETS)
+DB_QUERIES = Histogram("web_app_request_db_queries", "Database queries executed per request.",
+                       ["view"], buckets=QUERY_COUNT_BUCKETS)
+DB_DURATION = Histogram("web_app_request_db_duration_seconds", "Time spent in database queries per request.",
+                        ["view"], buckets=DB_DURATION_BUCKETS)
+TEMPLATE_DURATION = Histogram("web_app_request_template_duration_seconds",
+                              "Time spent rendering templates per request.", ["view"], buckets=DURATION_BUCKETS)
+RESPONSE_SIZE = Histogram("web_app_response_size_bytes", "Size of non-streaming response bodies.",
+                          ["view"], buckets=SIZE_BUCKETS)
+QUERY_BUDGET_OVERRUNS = Counter("web_app_query_budget_overruns_total",
+                                "Requests that executed more queries than their view's budget.", ["view"])
+LEASES_REAPED = Counter("web_app_leases_reaped_total", "Expired account leases released by the reaper.")
+LEASE_REAP_BATCH_DURATION = Histogram("web_app_lease_reap_batch_duration_seconds",
+                                      "Time spent in one reaper batch transaction.", buckets=DB_DURATION_BUCKETS)
+LOG_RECORDS_DROPPED = Counter("web_app_log_records_dropped_total",
+                              "Log records dropped because the logging queue was full.")
+LEASE_REAP_LAG = Gauge("web_app_lease_reap_lag_seconds",
+                       "How long the oldest expired lease still In use has been expired, before each reaper pass.",
+                       multiprocess_mode="livemax")
+
+
+class RequestStats:
+    """Per-request totals the middleware observes once the response is ready."""
+
+    __slots__ = ("queries", "db_time", "template_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+current_stats = ContextVar("current_stats", default=None)
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = current_stats.get()
+        if stats is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that adds each render's duration to the current request's stats."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def get_registry():
+    # Under gunicorn every worker writes its samples to PROMETHEUS_MULTIPROC_DIR, so a scrape of any one
+    # worker must collect all of their files rather than its own in-memory values.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics():
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
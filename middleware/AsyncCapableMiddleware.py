@@ -0,0 +1,40 @@
+"""
+References:
+
+    AsyncCapableMiddleware based on MiddlewareMixin in django source code:
+
+    Django (2023) [online] django/utils/deprecation.py. Available at:
+    https://github.com/django/django/blob/4.1/django/utils/deprecation.py (Accessed: 18 October 2026)
+
+    Django (2023) [online] Asynchronous support — Middleware. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/http/middleware/#asynchronous-support (Accessed: 18 October 2026)
+"""
+
+import asyncio
+
+
+class AsyncCapableMiddleware:
+    """
+    Base for middleware with a sync __call__ and an async __acall__. Django builds the chain once and tells each
+    middleware whether the next handler is async; when it is, __call__ returns __acall__'s coroutine, so an async
+    view is reached without switching to a sync thread and back at every middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Marks the instance as a coroutine function for asyncio.iscoroutinefunction, as MiddlewareMixin does.
+        self._is_coroutine = asyncio.coroutines._is_coroutine if asyncio.iscoroutinefunction(get_response) else None
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
@@ -0,0 +1,33 @@
+"""
+References:
+
+    EngineerMiddleware based on AuthenticationMiddleware in django source code:
+
+    Django (2023) [online] django/contrib/auth/middleware.py. Available at:
+    https://github.com/django/django/blob/4.1/django/contrib/auth/middleware.py (Accessed: 18 October 2026)
+"""
+
+from django.utils.functional import SimpleLazyObject
+
+from middleware.AsyncCapableMiddleware import AsyncCapableMiddleware
+from web_app.models import Engineer
+
+
+def get_engineer(request):
+    if not hasattr(request, "_cached_engineer"):
+        user = request.user
+        request._cached_engineer = (
+            Engineer.objects.filter(user_id=user.pk).first() if user.is_authenticated else None
+        )
+    return request._cached_engineer
+
+
+class EngineerMiddleware(AsyncCapableMiddleware):
+    def handle(self, request):
+        request.engineer = SimpleLazyObject(lambda: get_engineer(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Still lazy: an async view reads it through sync_to_async, as it does request.user.
+        request.engineer = SimpleLazyObject(lambda: get_engineer(request))
+        return await self.get_response(request)
@@ -0,0 +1,69 @@
+"""
+References:
+
+    MetricsMiddleware based on 'Database instrumentation' in django documentation:
+
+    Django (2023) [online] Database instrumentation. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/db/instrumentation/ (Accessed: 18 October 2026)
+"""
+
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from metrics import (DB_DURATION, DB_QUERIES, REQUEST_COUNT, REQUEST_DURATION, RESPONSE_SIZE, TEMPLATE_DURATION,
+                     RequestStats, current_stats)
+from middleware.AsyncCapableMiddleware import AsyncCapableMiddleware
+
+# Label for requests that did not resolve to a view, so 404 probes for arbitrary paths add no new series.
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+def install_stats(stack, stats):
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(stats))
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    def handle(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                install_stats(stack, stats)
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        # The request's queries run in its thread-sensitive sync thread, so the wrapper is installed there.
+        stack = ExitStack()
+        try:
+            await sync_to_async(install_stats)(stack, stats)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            current_stats.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, stats, duration):
+        match = request.resolver_match
+        view = match.view_name if match else UNRESOLVED_VIEW
+        REQUEST_COUNT.labels(view, request.method, response.status_code).inc()
+        REQUEST_DURATION.labels(view, request.method).observe(duration)
+        DB_QUERIES.labels(view).observe(stats.queries)
+        DB_DURATION.labels(view).observe(stats.db_time)
+        TEMPLATE_DURATION.labels(view).observe(stats.template_time)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view).observe(len(response.content))
@@ -0,0 +1,102 @@
+"""
+References:
+
+    BoundedQueueHandler based on 'Dealing with handlers that block' in the Python documentation:
+
+    Python Software Foundation (2023) [online] Logging Cookbook. Available at:
+    https://docs.python.org/3/howto/logging-cookbook.html#dealing-with-handlers-that-block (Accessed: 18 October 2026)
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else on a record was passed through `extra` and is emitted as a field.
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room instead of raising queue.Full, so stopping a listener behind a full queue still drains it.
+        self.queue.put(self._sentinel)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hand records to a background QueueListener that formats them as JSON and writes them to the stream, so the
+    request thread never waits on log I/O. When the queue is full new records are dropped and counted rather than
+    blocking the caller.
+    """
+
+    instances = []
+
+    def __init__(self, maxsize=10000, stream=None, level=logging.NOTSET):
+        super().__init__(queue.Queue(maxsize))
+        self.setLevel(level)
+        self.maxsize = maxsize
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.target.setFormatter(JSONFormatter())
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.listener = None
+        self.closed = False
+        self.start()
+        BoundedQueueHandler.instances.append(self)
+        if hasattr(os, "register_at_fork"):
+            # Threads do not survive fork(), so a forked worker (e.g. gunicorn --preload) starts its own listener.
+            os.register_at_fork(after_in_child=self.restart)
+
+    def start(self):
+        self.listener = DrainingQueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def restart(self):
+        if not self.closed:
+            self.queue = queue.Queue(self.maxsize)
+            self._dropped_lock = threading.Lock()
+            self.start()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Imported here, since this module is loaded while logging is configured, before the metrics are.
+            from metrics import LOG_RECORDS_DROPPED
+
+            with self._dropped_lock:
+                self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.listener.stop()
+        self.target.close()
+        if self in BoundedQueueHandler.instances:
+            BoundedQueueHandler.instances.remove(self)
+        super().close()
+
+
+def dropped_records():
+    return sum(handler.dropped for handler in BoundedQueueHandler.instances)
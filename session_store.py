@@ -0,0 +1,77 @@
+"""
+References:
+
+    SessionStore based on the cached_db session backend in django source code:
+
+    Django (2023) [online] django/contrib/sessions/backends/cached_db.py. Available at:
+    https://github.com/django/django/blob/4.1/django/contrib/sessions/backends/cached_db.py
+    (Accessed: 18 October 2026)
+
+    Write-behind caching based on 'Write-behind' in the AWS whitepaper:
+
+    Amazon Web Services (2021) [online] Database Caching Strategies Using Redis: Caching patterns. Available at:
+    https://docs.aws.amazon.com/whitepapers/latest/database-caching-strategies-using-redis/caching-patterns.html
+    (Accessed: 18 October 2026)
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+KEY_PREFIX = "session_store."
+
+AUTH_KEYS = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY)
+
+
+class SessionStore(CachedDBStore):
+    """
+    Sessions read from the cache, falling back to the database on a miss, like cached_db. Unlike cached_db a
+    save only reaches the database when the session is created, its login changes, or its database copy is
+    older than SESSION_WRITE_BEHIND_INTERVAL seconds; in between, changes are written to the cache alone.
+    Requires a cache shared by every worker: a per-process cache would keep serving a session another worker
+    has logged out.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.loaded_auth = None
+
+    @property
+    def persisted_key(self):
+        return f"{self.cache_key}:persisted"
+
+    def load(self):
+        data = super().load()
+        self.loaded_auth = self.auth_of(data)
+        return data
+
+    @staticmethod
+    def auth_of(data):
+        return tuple(data.get(key) for key in AUTH_KEYS)
+
+    def must_persist(self):
+        interval = settings.SESSION_WRITE_BEHIND_INTERVAL
+        if not interval or self.auth_of(self._session) != self.loaded_auth:
+            # Logins and logouts are always written through, so losing the cache never revives or loses one.
+            return True
+        persisted = self._cache.get(self.persisted_key)
+        return persisted is None or time.time() - persisted >= interval
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None or self.must_persist():
+            super().save(must_create)
+            self._cache.set(self.persisted_key, time.time(), self.get_expiry_age())
+            self.loaded_auth = self.auth_of(self._session)
+        else:
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        if session_key is None and self.session_key is not None:
+            session_key = self.session_key
+        super().delete(session_key)
+        if session_key is not None:
+            self._cache.delete(f"{self.cache_key_prefix}{session_key}:persisted")
@@ -0,0 +1,28 @@
+/*
+References:
+    Based on 'Using server-sent events' in MDN Web Docs:
+
+    MDN (2023) [online] Using server-sent events. Available at:
+    https://developer.mozilla.org/en-US/docs/Web/API/Server-sent_events/Using_server-sent_events
+    (Accessed: 18 October 2026).
+*/
+
+(function () {
+    var status = document.getElementById("currently-testing");
+    if (!status || !window.EventSource) {
+        return;
+    }
+    var source = new EventSource(status.dataset.eventsUrl);
+
+    source.addEventListener("testing_status", function (event) {
+        var engineer = JSON.parse(event.data).engineer;
+        var paragraph = document.createElement("p");
+        paragraph.textContent = engineer ? "Current engineer testing: " + engineer.name
+                                         : "No engineer currently testing.";
+        status.replaceChildren(paragraph);
+    });
+
+    source.addEventListener("account", function () {
+        document.getElementById("accounts-changed").hidden = false;
+    });
+})();
@@ -1,3 +1,57 @@
-from django.contrib import admin
+"""
+References:
+    Changelist options based on 'ModelAdmin options' in Django documentation:
 
-# Register your models here.
+    Django (2023) [online] The Django admin site | Django documentation. Available at:
+    https://docs.djangoproject.com/en/4.1/ref/contrib/admin/#modeladmin-options (Accessed: 18 October 2026).
+"""
+
+from django.contrib import admin, messages
+
+from web_app.bulk import update_status
+from web_app.models import Account, Engineer
+from web_app.pagination import EstimatedCountPaginator
+from web_app.search import search_accounts
+
+
+def status_action(status):
+    def set_status(modeladmin, request, queryset):
+        updated = update_status(queryset, status)
+        modeladmin.message_user(request, f"{updated} accounts set to {status.label}.", messages.SUCCESS)
+    set_status.__name__ = f"set_status_{status.name.lower()}"
+    return admin.action(description=f"Set status to {status.label}")(set_status)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings that keep the per-page cost independent of the table size."""
+
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered COUNT(*) the changelist runs to show "N total".
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(Account)
+class AccountAdmin(LargeTableAdmin):
+    list_display = ("ASIN", "marketplace", "status", "creator", "created", "modified")
+    # Each filter, alone or together, leads an index ending in (created, id), which also serves the ordering.
+    list_filter = ("marketplace", "status")
+    list_select_related = ("creator",)
+    ordering = ("-created", "-id")
+    search_fields = ("ASIN", "description")
+    autocomplete_fields = ("creator",)
+    actions = [status_action(status) for status in Account.Status]
+
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text index answers a search without scanning every description.
+        return search_accounts(queryset, search_term), False
+
+
+@admin.register(Engineer)
+class EngineerAdmin(LargeTableAdmin):
+    list_display = ("name", "user", "is_currently_testing")
+    list_filter = ("is_currently_testing",)
+    list_select_related = ("user",)
+    ordering = ("name", "id")
+    search_fields = ("name",)
+    autocomplete_fields = ("user",)
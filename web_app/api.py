@@ -0,0 +1,222 @@
+"""
+References:
+    Conditional GET handling based on the 'condition' decorator in Django documentation:
+
+    Django (2023) [online] Conditional View Processing | Django documentation. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/conditional-view-processing/ (Accessed: 18 October 2026).
+
+    claim_account_api and release_account_api based on the lease pattern in:
+
+    Gray, C. and Cheriton, D. (1989) 'Leases: An Efficient Fault-Tolerant Mechanism for Distributed File Cache
+    Consistency', ACM SIGOPS Operating Systems Review, 23(5), pp. 202-210.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import condition, require_GET, require_POST
+
+from web_app.cache import get_current_tester
+from web_app.forms import AccountFilterForm, ClaimAccountForm, ReleaseAccountForm
+from web_app.leases import claim_account, lease_duration, release_account
+from web_app.models import Account
+from web_app.pagination import KeysetPaginator
+from web_app.query_budget import query_budget
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+ACCOUNT_NOT_FOUND = "Account does not exist."
+
+ACCOUNT_FIELDS = ("id", "ASIN", "created", "modified", "marketplace", "description", "status", "creator__name")
+
+
+def authentication_required():
+    return JsonResponse({"error": "Authentication required."}, status=401)
+
+
+def api_login_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return authentication_required()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def serialize_account(account):
+    return {
+        "id": account.id,
+        "ASIN": account.ASIN,
+        "created": account.created,
+        "modified": account.modified,
+        "marketplace": account.marketplace,
+        "description": account.description,
+        "status": account.status,
+        "creator": account.creator.name,
+    }
+
+
+def filtered_accounts(request):
+    if not hasattr(request, "_filtered_accounts"):
+        form = AccountFilterForm(request.GET)
+        request._filtered_accounts = form.filter_queryset(Account.objects.all()) if form.is_valid() else None
+        request._filter_errors = form.errors
+    return request._filtered_accounts
+
+
+def filter_errors(request):
+    return JsonResponse({"errors": request._filter_errors}, status=400)
+
+
+# The filtered account list is versioned by its newest modified timestamp and row count, both answered from indexes.
+VERSION_AGGREGATES = {"last_modified": Max("modified"), "count": Count("id")}
+
+
+def version_etag(version):
+    if version is None or version["last_modified"] is None:
+        return None
+    return f'"{version["count"]}-{version["last_modified"].timestamp()}"'
+
+
+def version_last_modified(version):
+    return version["last_modified"] if version else None
+
+
+def page_limit(request):
+    """Return the requested page size capped at MAX_PAGE_SIZE and None, or None and a 400 response."""
+    try:
+        limit = min(int(request.GET.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return None, JsonResponse({"errors": {"limit": ["Enter a whole number."]}}, status=400)
+    if limit < 1:
+        return None, JsonResponse({"errors": {"limit": ["Ensure this value is greater than or equal to 1."]}},
+                                  status=400)
+    return limit, None
+
+
+def page_response(page):
+    return JsonResponse({
+        "results": [serialize_account(account) for account in page.object_list],
+        "next": page.next_cursor,
+        "previous": page.previous_cursor,
+    })
+
+
+def collection_version(request):
+    """Memoize the list's version on the request, so the ETag and Last-Modified checks share one query."""
+    if not hasattr(request, "_collection_version"):
+        queryset = filtered_accounts(request)
+        request._collection_version = queryset.aggregate(**VERSION_AGGREGATES) if queryset is not None else None
+    return request._collection_version
+
+
+def account_list_etag(request):
+    return version_etag(collection_version(request))
+
+
+def account_list_last_modified(request):
+    return version_last_modified(collection_version(request))
+
+
+@require_GET
+@api_login_required
+@query_budget(2)
+@condition(etag_func=account_list_etag, last_modified_func=account_list_last_modified)
+def account_list_api(request):
+    queryset = filtered_accounts(request)
+    if queryset is None:
+        return filter_errors(request)
+    limit, error = page_limit(request)
+    if error is not None:
+        return error
+
+    paginator = KeysetPaginator(queryset.select_related("creator").only(*ACCOUNT_FIELDS), limit)
+    return page_response(paginator.page(after=request.GET.get("after"), before=request.GET.get("before")))
+
+
+def account_modified(request, pk):
+    if not hasattr(request, "_account_modified"):
+        request._account_modified = Account.objects.filter(pk=pk).values_list("modified", flat=True).first()
+    return request._account_modified
+
+
+def modified_etag(pk, modified):
+    return f'"{pk}-{modified.timestamp()}"' if modified else None
+
+
+def account_etag(request, pk):
+    return modified_etag(pk, account_modified(request, pk))
+
+
+@require_GET
+@api_login_required
+@query_budget(2)
+@condition(etag_func=account_etag, last_modified_func=account_modified)
+def account_detail_api(request, pk):
+    account = Account.objects.select_related("creator").only(*ACCOUNT_FIELDS).filter(pk=pk).first()
+    if account is None:
+        raise Http404(ACCOUNT_NOT_FOUND)
+    return JsonResponse(serialize_account(account))
+
+
+def tester_payload(testers):
+    return {"id": testers[0].id, "name": testers[0].name} if testers else None
+
+
+def tester_etag(tester):
+    if tester is None:
+        return '"none"'
+    return f'"{tester["id"]}-{hashlib.md5(tester["name"].encode()).hexdigest()}"'
+
+
+def current_tester(request):
+    # Read once for the ETag and once for the body; without a shared cache each read is a query.
+    if not hasattr(request, "_current_tester"):
+        request._current_tester = tester_payload(get_current_tester())
+    return request._current_tester
+
+
+def current_tester_etag(request):
+    return tester_etag(current_tester(request))
+
+
+@require_GET
+@api_login_required
+@query_budget(1)
+@condition(etag_func=current_tester_etag)
+def current_tester_api(request):
+    return JsonResponse({"engineer": current_tester(request)})
+
+
+def serialize_lease(account):
+    return {**serialize_account(account), "lease_holder": account.lease_holder,
+            "lease_expires_at": account.lease_expires_at}
+
+
+@require_POST
+@api_login_required
+@query_budget(5)
+def claim_account_api(request):
+    form = ClaimAccountForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    account = claim_account(form.cleaned_data["marketplace"], form.cleaned_data["holder"] or request.user.username,
+                            lease_duration(form.cleaned_data["lease_seconds"]))
+    if account is None:
+        return JsonResponse({"error": "No free account in this marketplace."}, status=404)
+    return JsonResponse(serialize_lease(account))
+
+
+@require_POST
+@api_login_required
+@query_budget(3)
+def release_account_api(request, pk):
+    form = ReleaseAccountForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    if not release_account(pk, form.cleaned_data["holder"] or request.user.username):
+        return JsonResponse({"error": "Account is not leased to this holder."}, status=409)
+    return JsonResponse({"id": pk, "status": Account.Status.A})
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    from web_app.search import ensure_search_index
+    ensure_search_index(connections[using])
 
 
 class WebAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'web_app'
+
+    def ready(self):
+        from web_app import signals  # noqa: F401
+
+        post_migrate.connect(ensure_search_index, sender=self)
+
+        from login_throttle import check_shared_cache
+        checks.register(check_shared_cache, checks.Tags.security)
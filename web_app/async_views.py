@@ -0,0 +1,199 @@
+"""
+References:
+    Async views based on 'Asynchronous support' in Django documentation:
+
+    Django (2023) [online] Asynchronous support | Django documentation. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/async/ (Accessed: 18 October 2026).
+
+    Async queries based on 'Asynchronous queries' in Django documentation:
+
+    Django (2023) [online] Making queries | Django documentation. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/db/queries/#asynchronous-queries (Accessed: 18 October 2026).
+
+Async variants of the read-heavy views, routed by web_app.urls when ASYNC_READ_VIEWS is set (the default under
+web_app_project.asgi). In Django 4.1 the async ORM still runs each query in the request's sync thread; what the
+event loop gains is that a request waiting on the cache or the database does not hold a worker thread.
+"""
+
+from calendar import timegm
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views import View
+
+from web_app.api import (ACCOUNT_FIELDS, ACCOUNT_NOT_FOUND, VERSION_AGGREGATES, authentication_required,
+                         filter_errors, filtered_accounts, modified_etag, page_limit, page_response,
+                         serialize_account, tester_etag, tester_payload, version_etag, version_last_modified)
+from web_app.cache import get_cache, get_current_tester
+from web_app.models import Account
+from web_app.pagination import KeysetPaginator
+from web_app.query_budget import arun_within_budget, query_budget
+from web_app.stats import account_totals
+from web_app.views import AccountListView
+
+
+async def aget_user(request):
+    """Resolve the lazy request.user in the sync thread, after which it can be read from the event loop."""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def async_require_GET(view):
+    # django.views.decorators.http only wraps sync views in Django 4.1.
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return HttpResponseNotAllowed(["GET", "HEAD"])
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def async_api_login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not (await aget_user(request)).is_authenticated:
+            return authentication_required()
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """Async counterpart of django.views.decorators.http.condition; both functions are coroutines."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs) if etag_func else None
+            etag = quote_etag(etag) if etag else None
+            last_modified = await last_modified_func(request, *args, **kwargs) if last_modified_func else None
+            last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                if last_modified and not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault("ETag", etag)
+            return response
+        return wrapper
+    return decorator
+
+
+class AsyncAccountListView(AccountListView):
+    """AccountListView with the cache lookup and the page query awaited rather than blocking a thread."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        # LoginRequiredMixin and QueryBudgetMixin dispatch synchronously, so both checks are repeated here.
+        if not (await aget_user(request)).is_authenticated:
+            return self.handle_no_permission()
+        return await arun_within_budget(type(self).__name__, self.get_query_budget(), partial(View.dispatch, self),
+                                        request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        cache_key = await sync_to_async(self.get_cache_key)()
+        if cache_key is not None:
+            content = await get_cache().aget(cache_key)
+            if content is not None:
+                return HttpResponse(content)
+
+        # Validating the creator filter queries the database, so the queryset is built in the sync thread.
+        self.object_list = await sync_to_async(self.get_queryset)()
+        paginator = self.get_paginator(self.object_list, self.paginate_by)
+        self.keyset_page = paginator, await paginator.apage(after=request.GET.get("after"),
+                                                            before=request.GET.get("before"))
+        response = self.render_to_response(self.get_context_data())
+        if cache_key is not None:
+            response.add_post_render_callback(lambda rendered: self.cache_response(cache_key, rendered))
+        return response
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page = self.keyset_page
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+@query_budget(3)
+async def home_request(request):
+    await aget_user(request)
+    return await sync_to_async(render)(request, "web_app/home.html", {"account_totals": account_totals})
+
+
+async def afiltered_accounts(request):
+    return await sync_to_async(filtered_accounts)(request)
+
+
+async def collection_version(request):
+    if not hasattr(request, "_collection_version"):
+        queryset = await afiltered_accounts(request)
+        request._collection_version = (
+            await queryset.aaggregate(**VERSION_AGGREGATES) if queryset is not None else None
+        )
+    return request._collection_version
+
+
+async def account_list_etag(request):
+    return version_etag(await collection_version(request))
+
+
+async def account_list_last_modified(request):
+    return version_last_modified(await collection_version(request))
+
+
+@async_require_GET
+@async_api_login_required
+@query_budget(2)
+@async_condition(etag_func=account_list_etag, last_modified_func=account_list_last_modified)
+async def account_list_api(request):
+    queryset = await afiltered_accounts(request)
+    if queryset is None:
+        return filter_errors(request)
+    limit, error = page_limit(request)
+    if error is not None:
+        return error
+
+    paginator = KeysetPaginator(queryset.select_related("creator").only(*ACCOUNT_FIELDS), limit)
+    return page_response(await paginator.apage(after=request.GET.get("after"), before=request.GET.get("before")))
+
+
+async def account_modified(request, pk):
+    if not hasattr(request, "_account_modified"):
+        request._account_modified = await Account.objects.filter(pk=pk).values_list("modified", flat=True).afirst()
+    return request._account_modified
+
+
+async def account_etag(request, pk):
+    return modified_etag(pk, await account_modified(request, pk))
+
+
+@async_require_GET
+@async_api_login_required
+@query_budget(2)
+@async_condition(etag_func=account_etag, last_modified_func=account_modified)
+async def account_detail_api(request, pk):
+    try:
+        account = await Account.objects.select_related("creator").only(*ACCOUNT_FIELDS).aget(pk=pk)
+    except Account.DoesNotExist:
+        raise Http404(ACCOUNT_NOT_FOUND)
+    return JsonResponse(serialize_account(account))
+
+
+async def current_tester(request):
+    if not hasattr(request, "_current_tester"):
+        request._current_tester = tester_payload(await sync_to_async(get_current_tester)())
+    return request._current_tester
+
+
+async def current_tester_etag(request):
+    return tester_etag(await current_tester(request))
+
+
+@async_require_GET
+@async_api_login_required
+@query_budget(1)
+@async_condition(etag_func=current_tester_etag)
+async def current_tester_api(request):
+    return JsonResponse({"engineer": await current_tester(request)})
@@ -0,0 +1,320 @@
+"""
+References:
+    Latency percentiles based on 'statistics.quantiles' in the Python documentation:
+
+    Python Software Foundation (2023) [online] statistics — Mathematical statistics functions. Available at:
+    https://docs.python.org/3/library/statistics.html#statistics.quantiles (Accessed: 18 October 2026).
+
+    Peak memory based on 'tracemalloc.get_traced_memory' in the Python documentation:
+
+    Python Software Foundation (2023) [online] tracemalloc — Trace memory allocations. Available at:
+    https://docs.python.org/3/library/tracemalloc.html (Accessed: 18 October 2026).
+
+    Load generation based on 'Streams' in the Python documentation:
+
+    Python Software Foundation (2023) [online] asyncio — Streams. Available at:
+    https://docs.python.org/3/library/asyncio-stream.html (Accessed: 18 October 2026).
+"""
+
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from web_app.cache import get_cache, invalidate_account_caches, refresh_current_tester
+from web_app.models import Account, Engineer
+from web_app.stats import rebuild_stats
+
+BENCH_PASSWORD = "Bench_password123"
+
+# Every seeded row is created relative to this instant so two runs with the same seed build identical tables.
+SEED_EPOCH = datetime(2023, 1, 1, tzinfo=dt_timezone.utc)
+
+DESCRIPTION_WORDS = ("test", "contextual", "shopping", "alexa", "feature", "locale", "checkout", "voice",
+                     "recommendation", "search", "device", "order", "delivery", "regression", "smoke")
+
+# Routes measured with query strings in addition to their bare URL.
+EXTRA_SCENARIOS = {
+    "accounts?marketplace": ("accounts", {"marketplace": "US"}),
+    "accounts?q": ("accounts", {"q": "alexa"}),
+    "export_accounts?ndjson": ("export_accounts", {"format": "ndjson"}),
+    "api_accounts?limit": ("api_accounts", {"limit": 500}),
+}
+
+# Routes that only accept POST, which the GET-based benchmark cannot exercise.
+POST_ONLY_ROUTES = ("api_claim_account", "api_release_account")
+
+# Ratio a metric may grow by before compare() reports it; query counts may not grow at all.
+DEFAULT_THRESHOLD = 0.2
+
+COMPARED_METRICS = ("p50_ms", "p95_ms", "peak_memory_kb")
+
+# gunicorn arguments serving the project through each interface.
+SERVERS = {
+    "wsgi": ["web_app_project.wsgi:application"],
+    "asgi": ["web_app_project.asgi:application", "--worker-class", "uvicorn.workers.UvicornWorker"],
+}
+
+# The Host header must be one Django accepts when DEBUG is off.
+HOST = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+
+STARTUP_TIMEOUT = 30
+
+
+def seed(engineers=20, accounts=10000, seed=0, batch_size=1000):
+    """
+    Deterministically create engineers, each with a user, and accounts spread over them. The first user is a
+    superuser and the first engineer is currently testing. Returns that superuser.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD, salt=f"bench{seed}")
+    get_user_model().objects.bulk_create([
+        get_user_model()(username=f"bench_user_{i}", password=password, is_staff=i == 0, is_superuser=i == 0)
+        for i in range(engineers)
+    ])
+    users = list(get_user_model().objects.filter(username__startswith="bench_user_").order_by("id"))
+    Engineer.objects.bulk_create([
+        Engineer(name=f"Bench Engineer {i}", user=user, is_currently_testing=i == 0) for i, user in enumerate(users)
+    ])
+    creators = list(Engineer.objects.filter(user__in=users).order_by("id").values_list("id", flat=True))
+
+    marketplaces = Account.Marketplace.values
+    statuses = Account.Status.values
+    for start in range(0, accounts, batch_size):
+        Account.objects.bulk_create([
+            Account(
+                ASIN=f"BENCH{seed:04d}{i:010d}",
+                created=SEED_EPOCH + timedelta(minutes=i),
+                modified=SEED_EPOCH,
+                marketplace=rng.choice(marketplaces),
+                status=rng.choice(statuses),
+                description=" ".join(rng.choices(DESCRIPTION_WORDS, k=6)),
+                creator_id=rng.choice(creators),
+            )
+            for i in range(start, min(start + batch_size, accounts))
+        ])
+    rebuild_stats()
+    invalidate_account_caches()
+    refresh_current_tester()
+    return users[0]
+
+
+def scenarios(urlpatterns, account):
+    """Map a name to (url, query) for every named pattern, filling a pk argument with account's id."""
+    result = {}
+    for pattern in urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name or pattern.name in POST_ONLY_ROUTES:
+            continue
+        arguments = set(pattern.pattern.regex.groupindex)
+        if arguments - {"pk"}:
+            continue
+        kwargs = {"pk": account.pk} if arguments else {}
+        result[pattern.name] = (reverse(pattern.name, kwargs=kwargs), {})
+    for name, (route, query) in EXTRA_SCENARIOS.items():
+        if route in result:
+            result[name] = (result[route][0], query)
+    return result
+
+
+def percentile(timings, percent):
+    if len(timings) == 1:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[percent - 1]
+
+
+def fetch(client, user, url, query):
+    """Return the time, query count and, while tracemalloc is tracing, peak allocation of one GET."""
+    # Log in again before every request, outside the measurement: the logout route ends the session.
+    client.force_login(user)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(url, query)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if tracing else None
+    return elapsed, len(queries), peak, response
+
+
+def measure(client, user, url, query, requests=50, warmup=5, cold=False):
+    """
+    Time requests GETs of url after warmup untimed ones, then make one more with tracemalloc on, so tracing
+    does not inflate the timed requests. With cold, the cache is cleared before each request.
+    """
+    for _ in range(warmup):
+        fetch(client, user, url, query)
+    timings = []
+    for _ in range(requests):
+        if cold:
+            get_cache().clear()
+        elapsed, queries, _, response = fetch(client, user, url, query)
+        timings.append(elapsed)
+
+    if cold:
+        get_cache().clear()
+    tracemalloc.start()
+    try:
+        _, _, peak, _ = fetch(client, user, url, query)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "queries": queries,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(urlpatterns, user, names=None, requests=50, warmup=5, cold=False):
+    account = Account.objects.order_by("id").first()
+    client = Client()
+    results = {}
+    for name, (url, query) in sorted(scenarios(urlpatterns, account).items()):
+        if names and name not in names:
+            continue
+        results[name] = measure(client, user, url, query, requests, warmup, cold)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return a message for every metric in results that regressed against baseline."""
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        for metric in COMPARED_METRICS:
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {previous[metric]} -> {current[metric]} "
+                                   f"(+{current[metric] / previous[metric] - 1:.0%})")
+    return regressions
+
+
+async def request_once(address, host, path, cookie):
+    """Make one GET over a fresh connection, as gunicorn's sync workers close theirs; return (seconds, status)."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(*address)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nCookie: {cookie}\r\nConnection: close\r\n\r\n"
+                     .encode())
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    status_line = response.split(b"\r\n", 1)[0].split()
+    return elapsed, int(status_line[1]) if len(status_line) > 1 else 0
+
+
+async def load(address, host, path, cookie, concurrency, requests):
+    """
+    Send requests GETs of path to a server at address from concurrency clients, each waiting for its previous
+    response before sending the next, and report throughput and latency of the successful ones.
+    """
+    pending = iter(range(requests))
+    timings = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for _ in pending:
+            try:
+                elapsed, status = await request_once(address, host, path, cookie)
+            except OSError:
+                errors += 1
+                continue
+            if status == 200:
+                timings.append(elapsed)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "requests_per_second": round(len(timings) / wall, 1),
+        "p50_ms": round(percentile(timings, 50) * 1000, 3) if timings else None,
+        "p95_ms": round(percentile(timings, 95) * 1000, 3) if timings else None,
+        "errors": errors,
+    }
+
+
+def prepare_database(directory, database_url=None, engineers=20, accounts=10000, seed=0):
+    """
+    Migrate and seed database_url, by default a SQLite file in directory, from a child process. Return the
+    environment that points a server at it and a session cookie for the seeded superuser.
+    """
+    database_url = database_url or f"sqlite:///{os.path.join(directory, 'bench.sqlite3')}"
+    env = dict(os.environ, DATABASE_URL=database_url, PROMETHEUS_MULTIPROC_DIR=os.path.join(directory, "prometheus"))
+    # Either server would otherwise pick its views by how it was started; leave both on their defaults.
+    env.pop("ASYNC_READ_VIEWS", None)
+    manage = [sys.executable, os.path.join(settings.BASE_DIR, "manage.py")]
+    subprocess.run(manage + ["migrate", "--noinput", "-v", "0"], env=env, check=True)
+    seeded = subprocess.run(
+        manage + ["bench_servers", "--seed-only", "--engineers", str(engineers), "--accounts", str(accounts),
+                  "--seed", str(seed)],
+        env=env, check=True, capture_output=True, text=True)
+    return env, f"{settings.SESSION_COOKIE_NAME}={seeded.stdout.strip().splitlines()[-1]}"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(address, process, timeout=STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode} before accepting connections.")
+        try:
+            socket.create_connection(address, timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server did not accept connections on {address[0]}:{address[1]} within {timeout} seconds.")
+
+
+def start_server(name, env, workers):
+    """Start gunicorn with gunicorn.conf.py serving SERVERS[name]; return the process once it accepts connections."""
+    address = ("127.0.0.1", free_port())
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", *SERVERS[name], "--config", "gunicorn.conf.py", "--workers", str(workers),
+         "--bind", f"{address[0]}:{address[1]}", "--log-level", "warning"],
+        cwd=settings.BASE_DIR, env=env,
+    )
+    try:
+        wait_for_port(address, process)
+    except BaseException:
+        stop_server(process)
+        raise
+    return process, address
+
+
+def stop_server(process):
+    process.terminate()
+    process.wait()
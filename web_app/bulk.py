@@ -0,0 +1,68 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from web_app.cache import invalidate_account_caches
+from web_app.events import publish_account_event
+from web_app.importer import DEFAULT_BATCH_SIZE
+from web_app.models import Account
+from web_app.stats import KEY_FIELDS, apply_deltas, count_keys, stats_key
+
+EDITABLE_FIELDS = ("marketplace", "description", "status")
+
+
+def update_status(queryset, status):
+    """
+    Move every account in queryset that is not already in status to it with one UPDATE, and return how many
+    changed. update() bypasses save(), so modified, the account counts, the caches and live events are updated here.
+    """
+    queryset = queryset.exclude(status=status)
+    with transaction.atomic():
+        moved = count_keys(queryset)
+        updated = queryset.update(status=status, modified=timezone.now())
+        deltas = Counter()
+        for (creator_id, marketplace, old_status), count in moved.items():
+            deltas[creator_id, marketplace, old_status] -= count
+            deltas[creator_id, marketplace, status] += count
+        apply_deltas(deltas)
+    if updated:
+        invalidate_account_caches()
+        publish_account_event("bulk_updated", count=updated, status=status)
+    return updated
+
+
+def edit_accounts(edits, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Apply per-account edits, a dict of {pk: {field: value}} limited to EDITABLE_FIELDS, with bulk_update in
+    batches of batch_size inside one transaction. Values are validated like a form save would; the first
+    invalid account raises ValidationError and nothing is written. Returns the number of accounts updated.
+    """
+    fields = sorted({field for values in edits.values() for field in values})
+    unknown = set(fields) - set(EDITABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot bulk edit {', '.join(sorted(unknown))}.")
+    if not edits:
+        return 0
+
+    now = timezone.now()
+    with transaction.atomic():
+        accounts = []
+        deltas = Counter()
+        pks = list(edits)
+        for offset in range(0, len(pks), batch_size):
+            batch = Account.objects.filter(pk__in=pks[offset:offset + batch_size]).only("pk", *KEY_FIELDS, *fields)
+            for account in batch:
+                deltas[stats_key(account)] -= 1
+                for field, value in edits[account.pk].items():
+                    setattr(account, field, value)
+                account.modified = now
+                account.clean_fields(exclude=[f.name for f in Account._meta.fields if f.name not in fields])
+                deltas[stats_key(account)] += 1
+                accounts.append(account)
+        Account.objects.bulk_update(accounts, [*fields, "modified"], batch_size=batch_size)
+        apply_deltas(deltas)
+    if accounts:
+        invalidate_account_caches()
+        publish_account_event("bulk_updated", count=len(accounts))
+    return len(accounts)
@@ -0,0 +1,108 @@
+"""
+References:
+    Generation-keyed invalidation based on the 'cache versioning' and 'key-based expiration' approaches in:
+
+    Django (2023) [online] Django's cache framework | Django documentation. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/cache/#cache-versioning (Accessed: 18 October 2026).
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GENERATION_KEY = "accounts:generation"
+
+CURRENT_TESTER_KEY = "testing_status:current"
+
+USER_KEY = "auth:user:{}"
+
+
+def get_cache():
+    return caches[settings.ACCOUNT_LIST_CACHE_ALIAS]
+
+
+def get_generation():
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a generation key lost to eviction never revives entries cached under it.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY, 0)
+    return generation
+
+
+def bump_generation():
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_account_caches():
+    """
+    Drop every cached account page. Bump now so the writing request sees its own change, and again on commit
+    so a page rendered from the pre-commit state by another request is not kept under the new generation.
+    """
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+
+def account_page_cache_key(request, variant):
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"accounts:page:{get_generation()}:{variant}:{path_hash}"
+
+
+def get_current_tester():
+    """Return the engineers currently testing (at most one) from the cache, loading them on a miss."""
+    if not settings.TESTING_STATUS_CACHE_TIMEOUT:
+        return load_current_tester()
+    testers = get_cache().get(CURRENT_TESTER_KEY)
+    if testers is None:
+        testers = refresh_current_tester()
+    return testers
+
+
+def load_current_tester():
+    from web_app.models import Engineer
+
+    return list(Engineer.objects.filter(is_currently_testing=True).only("id", "name"))
+
+
+def refresh_current_tester():
+    testers = load_current_tester()
+    if settings.TESTING_STATUS_CACHE_TIMEOUT:
+        get_cache().set(CURRENT_TESTER_KEY, testers, settings.TESTING_STATUS_CACHE_TIMEOUT)
+    return testers
+
+
+def forget_current_tester():
+    get_cache().delete(CURRENT_TESTER_KEY)
+
+
+def get_user_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def get_cached_user(user_id, load):
+    """
+    Return the user with user_id from the cache, calling load(user_id) on a miss and caching a found user. The
+    cached row carries the password hash and the is_active, is_staff and is_superuser flags, so it is forgotten
+    whenever the user is saved; group and permission rows are still read when a permission is checked.
+    """
+    if not settings.AUTH_USER_CACHE_TIMEOUT:
+        return load(user_id)
+    key = USER_KEY.format(user_id)
+    user = get_user_cache().get(key)
+    if user is None:
+        user = load(user_id)
+        if user is not None:
+            get_user_cache().set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+def forget_user(user_id):
+    get_user_cache().delete(USER_KEY.format(user_id))
@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from web_app.cache import get_current_tester
+
+
+def testing_status(request):
+    """Expose the cached current tester to every template; the cache is only read if a template uses it."""
+    return {"testing_status": SimpleLazyObject(get_current_tester)}
@@ -0,0 +1,269 @@
+"""
+References:
+    Event stream format based on 'Server-sent events' in the HTML Living Standard:
+
+    WHATWG (2023) [online] HTML Living Standard: Server-sent events. Available at:
+    https://html.spec.whatwg.org/multipage/server-sent-events.html (Accessed: 18 October 2026).
+
+    events_app based on the HTTP connection scope in the ASGI specification:
+
+    ASGI (2023) [online] HTTP & WebSocket ASGI Message Format. Available at:
+    https://asgi.readthedocs.io/en/latest/specs/www.html (Accessed: 18 October 2026).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+from functools import wraps
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.http.cookie import parse_cookie
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = "/events/"
+
+TESTING_STATUS_EVENT = "testing_status"
+
+ACCOUNT_EVENT = "account"
+
+# Seconds between one process's deletes of events older than LIVE_EVENTS_RETENTION.
+PRUNE_INTERVAL = 60
+
+next_prune = 0.0
+
+
+def format_event(kind, data, event_id=None):
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {kind}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+class EventHub:
+    """
+    Fan events out to the subscribers connected to this process. Each subscriber is a bounded asyncio.Queue on
+    the event loop, so an idle subscriber costs a queue and a suspended task rather than a thread. A subscriber
+    that falls a whole queue behind is sent None and disconnected; the browser reconnects and starts afresh.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.loop = None
+        self.poller = None
+        self.next_id = 0
+
+    def subscribe(self):
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        # A poller left on a loop that has since closed never finishes, so it is replaced too.
+        if settings.LIVE_EVENTS_POLL_INTERVAL and (
+                self.poller is None or self.poller.done() or self.poller.get_loop() is not self.loop):
+            self.poller = self.loop.create_task(self.poll())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, kind, data, event_id=None):
+        """Deliver an event to every subscriber; safe to call from any thread."""
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.fan_out(kind, data, event_id)
+        else:
+            self.loop.call_soon_threadsafe(self.fan_out, kind, data, event_id)
+
+    def fan_out(self, kind, data, event_id=None):
+        if event_id is None:
+            self.next_id += 1
+            event_id = self.next_id
+        event = format_event(kind, data, event_id)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def poll(self):
+        """Relay LiveEvent rows written by any worker to this worker's subscribers while it has any."""
+        last_id = await in_worker_thread(latest_event_id)()
+        interval = settings.LIVE_EVENTS_POLL_INTERVAL
+        while self.subscribers:
+            await asyncio.sleep(interval)
+            try:
+                events = await in_worker_thread(events_after)(last_id)
+            except Exception:
+                logger.exception("Polling live events failed")
+                continue
+            for event_id, kind, data in events:
+                self.fan_out(kind, data, event_id)
+                last_id = event_id
+
+
+hub = EventHub()
+
+
+def in_worker_thread(function):
+    """
+    Run function in a thread of its own, off the loop, closing the thread's stale database connections before
+    and after as Django does around a request. The default thread_sensitive executor would funnel every open
+    event stream's database work through the one shared sync thread.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    @wraps(function)
+    async def wrapper(*args, **kwargs):
+        return await sync_to_async(run, thread_sensitive=False)(*args, **kwargs)
+    return wrapper
+
+
+def latest_event_id():
+    from web_app.models import LiveEvent
+
+    return LiveEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def events_after(last_id):
+    from web_app.models import LiveEvent
+
+    return list(LiveEvent.objects.filter(id__gt=last_id).order_by("id").values_list("id", "kind", "data"))
+
+
+def prune_events():
+    """Delete events older than LIVE_EVENTS_RETENTION, at most once per PRUNE_INTERVAL in each process."""
+    global next_prune
+    if time.monotonic() < next_prune:
+        return
+    next_prune = time.monotonic() + PRUNE_INTERVAL
+    from web_app.models import LiveEvent
+
+    LiveEvent.objects.filter(created__lt=timezone.now() - timedelta(seconds=settings.LIVE_EVENTS_RETENTION)).delete()
+
+
+def publish(kind, data):
+    """
+    Publish an event once the current transaction commits. With LIVE_EVENTS_POLL_INTERVAL set the event is
+    written to the database, where every worker's poller picks it up, and the publisher prunes old ones, so the
+    table stays small whether or not anyone is subscribed; otherwise it goes to this process's hub. Nothing is
+    published when LIVE_EVENTS is off.
+    """
+    if not settings.LIVE_EVENTS:
+        return
+
+    def send():
+        if settings.LIVE_EVENTS_POLL_INTERVAL:
+            from web_app.models import LiveEvent
+
+            LiveEvent.objects.create(kind=kind, data=data)
+            prune_events()
+        else:
+            hub.publish(kind, data)
+    transaction.on_commit(send)
+
+
+def testing_status_data(testers):
+    return {"engineer": {"id": testers[0].id, "name": testers[0].name} if testers else None}
+
+
+def publish_testing_status(engineer):
+    publish(TESTING_STATUS_EVENT, testing_status_data([engineer] if engineer else []))
+
+
+def publish_account_event(action, **data):
+    publish(ACCOUNT_EVENT, {"action": action, **data})
+
+
+def load_user(session_key):
+    store = import_string(f"{settings.SESSION_ENGINE}.SessionStore")(session_key)
+    return get_user(SimpleNamespace(session=store))
+
+
+def load_testing_status():
+    from web_app.cache import get_current_tester
+
+    return testing_status_data(get_current_tester())
+
+
+async def send_text(send, status, text):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8")]})
+    await send({"type": "http.response.body", "body": text.encode()})
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def events_app(scope, receive, send):
+    """
+    Stream live events to a logged in user as text/event-stream. Django 4.1 cannot stream from an async view,
+    so web_app_project.asgi routes EVENTS_PATH here before Django.
+    """
+    if not settings.LIVE_EVENTS:
+        # As under WSGI: 204 tells EventSource clients to stop reconnecting.
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    headers = dict(scope["headers"])
+    cookies = parse_cookie(headers.get(b"cookie", b"").decode("latin-1"))
+    user = await in_worker_thread(load_user)(cookies.get(settings.SESSION_COOKIE_NAME))
+    if not user.is_authenticated:
+        await send_text(send, 401, "Authentication required.")
+        return
+
+    queue = hub.subscribe()
+    disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ]})
+        status = await in_worker_thread(load_testing_status)()
+        await send({"type": "http.response.body", "more_body": True,
+                    "body": f"retry: {settings.LIVE_EVENTS_RETRY_MS}\n\n".encode()
+                    + format_event(TESTING_STATUS_EVENT, status)})
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({get, disconnect}, timeout=settings.LIVE_EVENTS_KEEPALIVE,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if get not in done:
+                get.cancel()
+            if disconnect in done:
+                return
+            if get in done:
+                body = get.result()
+                if body is None:
+                    break
+            else:
+                # Comments keep proxies from closing a connection that has been idle for a while.
+                body = b": keepalive\n\n"
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        hub.unsubscribe(queue)
+        disconnect.cancel()
@@ -0,0 +1,66 @@
+"""
+References:
+    Echo and csv_lines based on 'Streaming large CSV files' in Django documentation:
+
+    Django (2023) [online] How to create CSV output | Django documentation. Available at:
+    https://docs.djangoproject.com/en/4.1/howto/outputting-csv/#streaming-large-csv-files (Accessed: 18 October 2026).
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_COLUMNS = ("id", "ASIN", "created", "marketplace", "description", "status", "creator")
+EXPORT_FIELDS = ("id", "ASIN", "created", "marketplace", "description", "status", "creator__name")
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """Pseudo-buffer whose write() hands the formatted line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream tuples for the export columns, fetched from a server-side cursor chunk_size rows at a time."""
+    rows = queryset.order_by("id").values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield row[:2] + (row[2].isoformat(),) + row[3:]
+
+
+def batched(lines, size):
+    """Join lines into larger strings so the server writes one chunk per batch instead of one per row."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", csv_lines),
+    "ndjson": ("application/x-ndjson", ndjson_lines),
+}
+
+
+def export_accounts(queryset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    _, lines = EXPORT_FORMATS[export_format]
+    return batched(lines(export_rows(queryset, chunk_size)), chunk_size)
@@ -17,13 +17,21 @@ References:
     (Accessed: 13 July 2023).
 """
 
+from datetime import datetime, time, timedelta
+
 from django import forms
+from django.conf import settings
+from django.core.validators import MaxValueValidator
+from django.core.exceptions import ValidationError
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.utils import timezone
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Submit
 
+from web_app.importer import DEFAULT_BATCH_SIZE
 from web_app.models import Account, Engineer
+from web_app.search import search_accounts
 
 
 class CreateAccountForm(forms.ModelForm):
@@ -41,6 +49,11 @@ class EditAccountForm(forms.ModelForm):
         fields = ("ASIN", "created", "marketplace", "description", "status")
 
 
+class ImportAccountsForm(forms.Form):
+    file = forms.FileField(label="CSV file", help_text="Columns: ASIN, marketplace, description, status")
+    batch_size = forms.IntegerField(min_value=1, max_value=5000, initial=DEFAULT_BATCH_SIZE)
+
+
 class RegisterEngineerForm(UserCreationForm):
     first_name = forms.CharField(required=True)
     last_name = forms.CharField(required=True)
@@ -63,11 +76,87 @@ class RegisterEngineerForm(UserCreationForm):
         engineer = Engineer()
         engineer.name = user.get_full_name()
         if commit:
-            engineer.save()
             user.save()
+            engineer.user = user
+            engineer.save()
         return user
 
 
+class AccountFilterForm(forms.Form):
+    q = forms.CharField(label="Search", max_length=100, required=False)
+    marketplace = forms.ChoiceField(choices=[("", "Any")] + Account.Marketplace.choices, required=False)
+    status = forms.ChoiceField(choices=[("", "Any")] + Account.Status.choices, required=False)
+    creator = forms.ModelChoiceField(queryset=Engineer.objects.only("id", "name").order_by("name"), required=False)
+    created_after = forms.DateField(label="Created from", required=False,
+                                    widget=forms.DateInput(attrs={"type": "date"}))
+    created_before = forms.DateField(label="Created to", required=False,
+                                     widget=forms.DateInput(attrs={"type": "date"}))
+
+    def filter_queryset(self, queryset):
+        """Apply the filters that validated; call after is_valid()."""
+        data = self.cleaned_data
+        if data.get("marketplace"):
+            queryset = queryset.filter(marketplace=data["marketplace"])
+        if data.get("status"):
+            queryset = queryset.filter(status=data["status"])
+        if data.get("creator"):
+            queryset = queryset.filter(creator=data["creator"])
+        if data.get("created_after"):
+            queryset = queryset.filter(created__gte=self.start_of_day(data["created_after"]))
+        if data.get("created_before"):
+            queryset = queryset.filter(created__lt=self.start_of_day(data["created_before"] + timedelta(days=1)))
+        if data.get("q"):
+            queryset = search_accounts(queryset, data["q"])
+        return queryset
+
+    @staticmethod
+    def start_of_day(date):
+        return timezone.make_aware(datetime.combine(date, time.min))
+
+
+class AccountScopeForm(AccountFilterForm):
+    """
+    The accounts a bulk action applies to: the selected ids among those matching the filters, or with all set
+    every account matching them. Nothing is selected without either, so an empty selection never means everything.
+    """
+
+    ids = forms.Field(required=False, widget=forms.MultipleHiddenInput)
+    all = forms.BooleanField(required=False, widget=forms.HiddenInput)
+
+    def clean_ids(self):
+        try:
+            return sorted({int(pk) for pk in self.cleaned_data["ids"] or ()})
+        except ValueError:
+            raise ValidationError("Enter whole numbers.")
+
+    def scope_queryset(self, queryset):
+        queryset = self.filter_queryset(queryset)
+        if self.cleaned_data["ids"]:
+            return queryset.filter(pk__in=self.cleaned_data["ids"])
+        if self.cleaned_data["all"]:
+            return queryset
+        return queryset.none()
+
+
+class BulkStatusForm(forms.Form):
+    status = forms.ChoiceField(label="New status", choices=Account.Status.choices)
+
+
+class ClaimAccountForm(forms.Form):
+    marketplace = forms.ChoiceField(choices=Account.Marketplace.choices)
+    holder = forms.CharField(required=False, max_length=150, help_text="Defaults to the username")
+    lease_seconds = forms.IntegerField(required=False, min_value=1)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["lease_seconds"].max_value = settings.ACCOUNT_LEASE_MAX_SECONDS
+        self.fields["lease_seconds"].validators.append(MaxValueValidator(settings.ACCOUNT_LEASE_MAX_SECONDS))
+
+
+class ReleaseAccountForm(forms.Form):
+    holder = forms.CharField(required=False, max_length=150, help_text="Defaults to the username")
+
+
 class SetTestingStatusForm(forms.Form):
     engineer = forms.ModelChoiceField(
         label="Engineer Choices", queryset=Engineer.objects.all(), required=True)
@@ -0,0 +1,148 @@
+"""
+References:
+    Claiming with SKIP LOCKED based on 'The Locking Clause' in PostgreSQL documentation:
+
+    PostgreSQL (2023) [online] SELECT — The Locking Clause. Available at:
+    https://www.postgresql.org/docs/current/sql-select.html#SQL-FOR-UPDATE-SHARE (Accessed: 18 October 2026).
+
+    Django (2023) [online] QuerySet API reference — select_for_update(). Available at:
+    https://docs.djangoproject.com/en/4.1/ref/models/querysets/#select-for-update (Accessed: 18 October 2026).
+
+    The SQLite path based on the write locking described in:
+
+    SQLite (2023) [online] File Locking And Concurrency In SQLite Version 3. Available at:
+    https://www.sqlite.org/lockingv3.html (Accessed: 18 October 2026).
+"""
+
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from web_app.cache import invalidate_account_caches
+from web_app.events import publish_account_event
+from web_app.models import Account
+from web_app.stats import apply_deltas
+
+# Without SKIP LOCKED, claimers try the oldest free accounts in random order, so concurrent claimers mostly
+# pick different rows instead of all retrying on the first one.
+CLAIM_WINDOW = 20
+
+CLAIM_ATTEMPTS = 5
+
+# Leases the reaper releases per transaction; small batches keep each one's locks short.
+REAP_BATCH_SIZE = 100
+
+
+def lease_duration(seconds=None):
+    return timedelta(seconds=seconds or settings.ACCOUNT_LEASE_SECONDS)
+
+
+def take(candidate, marketplace, holder, expires, now):
+    """Move one free account to In use for holder; return whether it was still free."""
+    pk, creator_id = candidate
+    if not Account.objects.filter(pk=pk, status=Account.Status.A).update(
+            status=Account.Status.IU, lease_holder=holder, lease_expires_at=expires, modified=now):
+        return False
+    apply_deltas({(creator_id, marketplace, Account.Status.A): -1, (creator_id, marketplace, Account.Status.IU): 1})
+    return True
+
+
+def claim_account(marketplace, holder, duration=None):
+    """
+    Mark an Active account in marketplace In use by holder until the lease expires, and return it, or None when
+    every account there is taken. On PostgreSQL the oldest row is picked with FOR UPDATE SKIP LOCKED, so concurrent
+    claimers skip rows another is taking instead of queueing on them. SQLite has no row locks and admits one writer
+    at a time, so there one of the CLAIM_WINDOW oldest is taken with a compare-and-set UPDATE, and another is tried
+    when a concurrent claimer won it.
+    """
+    now = timezone.now()
+    expires = now + (duration or lease_duration())
+    free = Account.objects.filter(marketplace=marketplace, status=Account.Status.A).order_by("created", "id")
+    claimed = None
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            candidate = free.select_for_update(skip_locked=True).values_list("pk", "creator_id").first()
+            if candidate is not None and take(candidate, marketplace, holder, expires, now):
+                claimed = candidate[0]
+    else:
+        for _ in range(CLAIM_ATTEMPTS):
+            # Read outside the transaction, so each one starts with its write and never upgrades a read lock.
+            candidates = list(free.values_list("pk", "creator_id")[:CLAIM_WINDOW])
+            if not candidates:
+                break
+            random.shuffle(candidates)
+            for candidate in candidates:
+                with transaction.atomic():
+                    if take(candidate, marketplace, holder, expires, now):
+                        claimed = candidate[0]
+                        break
+            if claimed is not None:
+                break
+    if claimed is None:
+        return None
+    invalidate_account_caches()
+    publish_account_event("claimed", id=claimed, holder=holder)
+    return Account.objects.select_related("creator").get(pk=claimed)
+
+
+def release_account(pk, holder):
+    """Return the account with pk to Active if holder still holds its lease; return whether it did."""
+    with transaction.atomic():
+        # The UPDATE comes first, so on SQLite the transaction takes the write lock before it reads.
+        if not Account.objects.filter(pk=pk, status=Account.Status.IU, lease_holder=holder).update(
+                status=Account.Status.A, lease_holder="", lease_expires_at=None, modified=timezone.now()):
+            return False
+        creator_id, marketplace = Account.objects.values_list("creator_id", "marketplace").get(pk=pk)
+        apply_deltas({(creator_id, marketplace, Account.Status.IU): -1,
+                      (creator_id, marketplace, Account.Status.A): 1})
+    invalidate_account_caches()
+    publish_account_event("released", id=pk, holder=holder)
+    return True
+
+
+def expired_leases(now):
+    # Served by account_lease_expiry_idx, in the order the leases expired.
+    return Account.objects.filter(status=Account.Status.IU, lease_expires_at__lt=now).order_by("lease_expires_at")
+
+
+def oldest_expired_lease(now):
+    return expired_leases(now).values_list("lease_expires_at", flat=True).first()
+
+
+def reap_expired_leases(now=None, batch_size=REAP_BATCH_SIZE):
+    """
+    Return up to batch_size accounts whose lease expired before now to Active in one short transaction, and return
+    how many were released. On PostgreSQL rows being claimed or released by a request are skipped rather than
+    waited on; on SQLite a batch that lost a row to a concurrent release is rolled back and read again.
+    """
+    now = now or timezone.now()
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    for _ in range(CLAIM_ATTEMPTS):
+        expired = expired_leases(now).values_list("pk", "creator_id", "marketplace")
+        if not skip_locked:
+            # Read outside the transaction, so it starts with its write, as claims do.
+            batch = list(expired[:batch_size])
+        with transaction.atomic():
+            if skip_locked:
+                batch = list(expired.select_for_update(skip_locked=True)[:batch_size])
+            if not batch:
+                return 0
+            released = Account.objects.filter(pk__in=[pk for pk, _, _ in batch], status=Account.Status.IU,
+                                              lease_expires_at__lt=now).update(
+                status=Account.Status.A, lease_holder="", lease_expires_at=None, modified=timezone.now())
+            if released != len(batch):
+                transaction.set_rollback(True)
+                continue
+            deltas = Counter()
+            for _, creator_id, marketplace in batch:
+                deltas[creator_id, marketplace, Account.Status.IU] -= 1
+                deltas[creator_id, marketplace, Account.Status.A] += 1
+            apply_deltas(deltas)
+        invalidate_account_caches()
+        publish_account_event("reaped", count=released)
+        return released
+    return 0
@@ -0,0 +1,63 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from web_app import urls
+from web_app.bench import DEFAULT_THRESHOLD, compare, run_benchmark, seed
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway test database and report per-route latency percentiles, query counts and peak "
+            "memory as JSON, optionally failing on regressions against a baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--engineers", type=int, default=20)
+        parser.add_argument("--accounts", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--requests", type=int, default=50, help="Timed requests per route")
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per route")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request")
+        parser.add_argument("--route", action="append", dest="routes", help="Only benchmark this route")
+        parser.add_argument("--output", help="File to write the JSON report to (defaults to stdout)")
+        parser.add_argument("--baseline", help="JSON report to compare against")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="Allowed growth ratio for latency and memory (default 0.2)")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["engineers"] < 1:
+            raise CommandError("--requests and --engineers must be at least 1.")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as file:
+                baseline = json.load(file)["routes"]
+
+        # Run against test databases, as the test runner does, so seeding never touches real data.
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            user = seed(options["engineers"], options["accounts"], options["seed"])
+            results = run_benchmark(urls.urlpatterns, user, options["routes"], options["requests"],
+                                    options["warmup"], options["cold"])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "config": {key: options[key] for key in ("engineers", "accounts", "seed", "requests", "warmup", "cold")},
+            "python": sys.version.split()[0],
+            "routes": results,
+        }
+        regressions = compare(results, baseline, options["threshold"]) if baseline else []
+        report["regressions"] = regressions
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions against {options['baseline']}:\n"
+                               + "\n".join(regressions))
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from web_app.bench import HOST, SERVERS, load, prepare_database, seed, start_server, stop_server
+
+DEFAULT_ROUTES = ("home", "accounts", "api_accounts", "api_testing_status")
+
+DEFAULT_CONCURRENCY = (1, 16, 64)
+
+
+class Command(BaseCommand):
+    help = ("Serve the same seeded database with gunicorn's sync workers (WSGI) and with uvicorn workers (ASGI) "
+            "at a fixed worker count, load each route at several concurrency levels and report requests per "
+            "second and latency percentiles as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes for both servers")
+        parser.add_argument("--concurrency", type=int, action="append",
+                            help="Concurrent clients; repeat for several levels (default 1, 16 and 64)")
+        parser.add_argument("--requests", type=int, default=200, help="Timed requests per route and level")
+        parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per route")
+        parser.add_argument("--route", action="append", dest="routes",
+                            help="Named route to load (default home, accounts, api_accounts, api_testing_status)")
+        parser.add_argument("--server", action="append", dest="servers", choices=sorted(SERVERS))
+        parser.add_argument("--engineers", type=int, default=20)
+        parser.add_argument("--accounts", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--database-url",
+                            help="Empty database to seed and serve (defaults to a temporary SQLite file)")
+        parser.add_argument("--output", help="File to write the JSON report to (defaults to stdout)")
+        # Run by the parent in a child process whose DATABASE_URL points at the benchmark database.
+        parser.add_argument("--seed-only", action="store_true", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["seed_only"]:
+            user = seed(options["engineers"], options["accounts"], options["seed"])
+            client = Client()
+            client.force_login(user)
+            self.stdout.write(client.cookies[settings.SESSION_COOKIE_NAME].value)
+            return
+        if options["workers"] < 1 or options["requests"] < 1:
+            raise CommandError("--workers and --requests must be at least 1.")
+
+        with tempfile.TemporaryDirectory() as directory:
+            env, cookie = prepare_database(directory, options["database_url"], options["engineers"],
+                                           options["accounts"], options["seed"])
+            results = {}
+            for name in options["servers"] or sorted(SERVERS):
+                results[name] = self.run_server(name, env, cookie, options)
+
+        report = {
+            "config": {key: options[key] for key in ("workers", "requests", "warmup", "engineers", "accounts",
+                                                     "seed")},
+            "python": sys.version.split()[0],
+            "servers": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def run_server(self, name, env, cookie, options):
+        try:
+            process, address = start_server(name, env, options["workers"])
+        except RuntimeError as error:
+            raise CommandError(str(error))
+        try:
+            routes = {}
+            for route in options["routes"] or DEFAULT_ROUTES:
+                path = reverse(route)
+                asyncio.run(load(address, HOST, path, cookie, max(options["concurrency"] or DEFAULT_CONCURRENCY),
+                                 options["warmup"]))
+                routes[route] = {
+                    str(concurrency): asyncio.run(load(address, HOST, path, cookie, concurrency, options["requests"]))
+                    for concurrency in options["concurrency"] or DEFAULT_CONCURRENCY
+                }
+            return routes
+        finally:
+            stop_server(process)
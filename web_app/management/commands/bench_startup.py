@@ -0,0 +1,95 @@
+import asyncio
+import json
+import sys
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from web_app.bench import HOST, SERVERS, percentile, prepare_database, request_once, start_server, stop_server
+
+DEFAULT_ROUTES = ("home", "accounts", "api_accounts")
+
+# gunicorn.conf.py settings for a server started as before it was tuned, and as configured now.
+MODES = {
+    "cold": {"GUNICORN_PRELOAD": "False", "GUNICORN_WARM_UP": "False"},
+    "warm": {"GUNICORN_PRELOAD": "True", "GUNICORN_WARM_UP": "True"},
+}
+
+# A response counts as fast once it takes at most this multiple of the route's steady-state median.
+FAST_FACTOR = 2
+
+
+class Command(BaseCommand):
+    help = ("Start gunicorn without and with preloading and warm-up, and report as JSON how long after starting "
+            "it accepts connections, answers its first request and answers its first fast request.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", choices=sorted(SERVERS), default="asgi")
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--requests", type=int, default=20, help="Requests per route after the first one")
+        parser.add_argument("--route", action="append", dest="routes",
+                            help="Named route to request (default home, accounts, api_accounts)")
+        parser.add_argument("--engineers", type=int, default=20)
+        parser.add_argument("--accounts", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--database-url",
+                            help="Empty database to seed and serve (defaults to a temporary SQLite file)")
+        parser.add_argument("--output", help="File to write the JSON report to (defaults to stdout)")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["requests"] < 1:
+            raise CommandError("--workers and --requests must be at least 1.")
+        with tempfile.TemporaryDirectory() as directory:
+            env, cookie = prepare_database(directory, options["database_url"], options["engineers"],
+                                           options["accounts"], options["seed"])
+            results = {mode: self.profile(dict(env, **overrides), cookie, options)
+                       for mode, overrides in MODES.items()}
+
+        report = {
+            "config": {key: options[key] for key in ("server", "workers", "requests", "engineers", "accounts",
+                                                     "seed")},
+            "python": sys.version.split()[0],
+            "modes": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def profile(self, env, cookie, options):
+        start = time.perf_counter()
+        try:
+            process, address = start_server(options["server"], env, options["workers"])
+        except RuntimeError as error:
+            raise CommandError(str(error))
+        try:
+            ready = time.perf_counter() - start
+            # (seconds since start at which the response arrived, latency) for every request, in order.
+            responses = []
+            routes = {}
+            for route in options["routes"] or DEFAULT_ROUTES:
+                path = reverse(route)
+                timings = []
+                for _ in range(options["requests"] + 1):
+                    elapsed, status = asyncio.run(request_once(address, HOST, path, cookie))
+                    if status != 200:
+                        raise CommandError(f"{route} answered {status}.")
+                    timings.append(elapsed)
+                    responses.append((time.perf_counter() - start, elapsed, route))
+                routes[route] = {"first_ms": round(timings[0] * 1000, 3),
+                                 "steady_p50_ms": round(percentile(timings[1:], 50) * 1000, 3)}
+        finally:
+            stop_server(process)
+
+        first_fast = next(at for at, elapsed, route in responses
+                          if elapsed * 1000 <= FAST_FACTOR * routes[route]["steady_p50_ms"])
+        return {
+            "ready_s": round(ready, 3),
+            "first_response_s": round(responses[0][0], 3),
+            "first_fast_response_s": round(first_fast, 3),
+            "routes": routes,
+        }
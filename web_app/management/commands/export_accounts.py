@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from web_app.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_accounts
+from web_app.forms import AccountFilterForm
+from web_app.models import Account
+
+
+class Command(BaseCommand):
+    help = "Stream the accounts table as CSV or NDJSON without loading it into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+        parser.add_argument("--marketplace", default="")
+        parser.add_argument("--status", default="")
+        parser.add_argument("--creator", default="", help="Engineer id")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--output", help="File to write to (defaults to stdout)")
+
+    def handle(self, *args, **options):
+        form = AccountFilterForm({key: options[key] for key in ("marketplace", "status", "creator")})
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+
+        chunks = export_accounts(form.filter_queryset(Account.objects.all()), options["format"],
+                                 options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from web_app.importer import DEFAULT_BATCH_SIZE, UNREADABLE_FILE_ERRORS, import_accounts, read_csv
+from web_app.models import Engineer
+
+
+class Command(BaseCommand):
+    help = "Import accounts from a CSV file with columns ASIN, marketplace, description, status."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--creator", type=int, required=True, help="Engineer id")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            creator = Engineer.objects.get(pk=options["creator"])
+        except Engineer.DoesNotExist:
+            raise CommandError(f"Engineer {options['creator']} does not exist.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        with open(options["path"], "rb") as file:
+            try:
+                result = import_accounts(read_csv(file), creator, options["batch_size"])
+            except UNREADABLE_FILE_ERRORS as error:
+                raise CommandError(f"{options['path']} could not be read as UTF-8 CSV: {error}")
+
+        for line, message in result.errors:
+            self.stderr.write(f"line {line or '-'}: {message}")
+        self.stdout.write(f"Imported {result.created} accounts in {result.elapsed:.3f}s "
+                          f"({result.rows_per_second:.0f} rows/sec), {len(result.errors)} errors.")
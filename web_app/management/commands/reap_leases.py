@@ -0,0 +1,81 @@
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+from prometheus_client import REGISTRY, push_to_gateway, start_http_server
+
+from metrics import LEASE_REAP_BATCH_DURATION, LEASE_REAP_LAG, LEASES_REAPED
+from web_app.leases import REAP_BATCH_SIZE, oldest_expired_lease, reap_expired_leases
+
+
+class Command(BaseCommand):
+    help = ("Return accounts whose lease has expired from In use to Active, in small batches with a short "
+            "transaction each. Runs until stopped, one pass every --interval seconds, or a single pass with --once "
+            "(e.g. from cron). Each pass reports how many leases it released, how fast, and how long the oldest "
+            "had been expired. The same figures are served as Prometheus metrics on --metrics-port, or pushed to "
+            "the --pushgateway after every pass, since the reaper need not share a host with the web workers.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Make one pass and exit")
+        parser.add_argument("--interval", type=float, default=30, help="Seconds between passes")
+        parser.add_argument("--batch-size", type=int, default=REAP_BATCH_SIZE, help="Leases released per transaction")
+        parser.add_argument("--pause", type=float, default=0.05,
+                            help="Seconds to wait between batches, so request transactions get the locks in between")
+        parser.add_argument("--metrics-port", type=int, default=settings.REAPER_METRICS_PORT,
+                            help="Port to serve the reaper's metrics on; 0 serves none")
+        parser.add_argument("--pushgateway", default=settings.REAPER_PUSHGATEWAY,
+                            help="Pushgateway address to push the reaper's metrics to after every pass")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["interval"] <= 0:
+            raise CommandError("--batch-size and --interval must be positive.")
+        stop = threading.Event()
+        if not options["once"]:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
+        while True:
+            self.reap(options["batch_size"], options["pause"], stop)
+            if options["pushgateway"]:
+                self.push(options["pushgateway"])
+            if options["once"] or stop.wait(options["interval"]):
+                return
+            # A long-running process outlives CONN_MAX_AGE like a request would; drop stale connections.
+            close_old_connections()
+
+    def reap(self, batch_size, pause, stop):
+        now = timezone.now()
+        oldest = oldest_expired_lease(now)
+        lag = (now - oldest).total_seconds() if oldest else 0.0
+        LEASE_REAP_LAG.set(lag)
+
+        start = time.perf_counter()
+        released = 0
+        while not stop.is_set():
+            batch_start = time.perf_counter()
+            count = reap_expired_leases(now, batch_size)
+            LEASE_REAP_BATCH_DURATION.observe(time.perf_counter() - batch_start)
+            LEASES_REAPED.inc(count)
+            released += count
+            if count < batch_size:
+                break
+            time.sleep(pause)
+        elapsed = time.perf_counter() - start
+
+        rate = released / elapsed if elapsed else 0.0
+        self.stdout.write(f"Released {released} expired leases in {elapsed:.3f}s ({rate:.0f}/s); "
+                          f"oldest was expired for {lag:.0f}s.")
+        return released
+
+    def push(self, gateway):
+        try:
+            push_to_gateway(gateway, job="reap_leases", registry=REGISTRY)
+        except OSError as error:
+            # The leases were released all the same; the next pass pushes the totals again.
+            self.stderr.write(f"Could not push metrics to {gateway}: {error}")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from web_app.cache import invalidate_account_caches
+from web_app.models import Account
+from web_app.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = ("Recount the account totals from the accounts table, replacing any that have drifted, and report the "
+            "corrections. Account writes wait for the recount on PostgreSQL; SQLite serialises writers anyway.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report the drift without correcting it")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # EXCLUSIVE still lets the list pages read accounts, but blocks writes until the totals are replaced.
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LOCK TABLE {Account._meta.db_table} IN EXCLUSIVE MODE")
+            drift = rebuild_stats()
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+            elif drift:
+                invalidate_account_caches()
+
+        for (creator_id, marketplace, status), difference in sorted(drift.items()):
+            self.stdout.write(f"creator {creator_id} {marketplace} {status}: {difference:+d}")
+        verb = "Found" if options["dry_run"] else "Corrected"
+        self.stdout.write(f"{verb} {len(drift)} drifted totals.")
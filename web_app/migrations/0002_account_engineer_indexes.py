@@ -0,0 +1,47 @@
+# Generated by Django 4.1.1 on 2026-10-18 10:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='creator',
+            field=models.ForeignKey(blank=True, db_index=False, on_delete=django.db.models.deletion.CASCADE, to='web_app.engineer'),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['created', 'id'], name='account_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['creator', 'created', 'id'], name='account_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['marketplace', 'status', 'created', 'id'], name='account_market_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['marketplace', 'created', 'id'], name='account_market_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['status', 'created', 'id'], name='account_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='engineer',
+            index=models.Index(fields=['name'], name='engineer_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='engineer',
+            index=models.Index(condition=models.Q(('is_currently_testing', True)), fields=['is_currently_testing'], name='engineer_testing_idx'),
+        ),
+    ]
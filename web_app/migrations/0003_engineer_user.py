@@ -0,0 +1,21 @@
+# Generated by Django 4.1.1 on 2026-10-18 10:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('web_app', '0002_account_engineer_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='engineer',
+            name='user',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='engineer', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations
+
+
+def link_engineers_to_users(apps, schema_editor):
+    """
+    Engineers were previously matched to users by full name, so link each engineer to the user whose
+    "first_name last_name" equals the engineer name. Names shared by several users or engineers are ambiguous
+    and are left unlinked.
+    """
+    Engineer = apps.get_model("web_app", "Engineer")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+
+    engineers_by_name = defaultdict(list)
+    for engineer in Engineer.objects.filter(user__isnull=True).only("id", "name"):
+        engineers_by_name[engineer.name].append(engineer)
+
+    users_by_name = defaultdict(list)
+    for user_id, first_name, last_name in User.objects.values_list("id", "first_name", "last_name"):
+        users_by_name[f"{first_name} {last_name}".strip()].append(user_id)
+
+    linked = []
+    for name, engineers in engineers_by_name.items():
+        user_ids = users_by_name.get(name, [])
+        if len(engineers) == 1 and len(user_ids) == 1:
+            engineers[0].user_id = user_ids[0]
+            linked.append(engineers[0])
+    Engineer.objects.bulk_update(linked, ["user"], batch_size=500)
+
+
+def unlink_engineers(apps, schema_editor):
+    Engineer = apps.get_model("web_app", "Engineer")
+    Engineer.objects.update(user=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('web_app', '0003_engineer_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_engineers_to_users, unlink_engineers),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from web_app.search import create_search_index, drop_search_index
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_app', '0004_backfill_engineer_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
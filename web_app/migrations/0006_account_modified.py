@@ -0,0 +1,18 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_app', '0005_account_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='date modified'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_testing_slot(apps, schema_editor):
+    """
+    Earlier handoffs could race and leave several engineers testing. Keep the most recently created one, so the
+    unique constraint can be added, and record it in the slot.
+    """
+    Engineer = apps.get_model("web_app", "Engineer")
+    TestingSlot = apps.get_model("web_app", "TestingSlot")
+
+    tester = Engineer.objects.filter(is_currently_testing=True).order_by("-id").first()
+    if tester is not None:
+        Engineer.objects.filter(is_currently_testing=True).exclude(pk=tester.pk).update(is_currently_testing=False)
+    TestingSlot.objects.create(pk=1, engineer=tester)
+
+
+def delete_testing_slot(apps, schema_editor):
+    apps.get_model("web_app", "TestingSlot").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_app', '0006_account_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestingSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('engineer', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='web_app.engineer')),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(check=models.Q(('id', 1)), name='testing_slot_singleton')],
+            },
+        ),
+        migrations.RunPython(create_testing_slot, delete_testing_slot),
+        migrations.RemoveIndex(
+            model_name='engineer',
+            name='engineer_testing_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='engineer',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_currently_testing', True)), fields=('is_currently_testing',), name='engineer_single_tester'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_accounts(apps, schema_editor):
+    Account = apps.get_model('web_app', 'Account')
+    AccountStats = apps.get_model('web_app', 'AccountStats')
+    rows = Account.objects.order_by().values('creator_id', 'marketplace', 'status').annotate(count=models.Count('id'))
+    AccountStats.objects.bulk_create([AccountStats(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_app', '0008_live_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marketplace', models.CharField(choices=[('US', 'United States'), ('UK', 'United Kingdom'), ('IN', 'India')], max_length=50)),
+                ('status', models.CharField(choices=[('A', 'Active'), ('IU', 'In use'), ('D', 'Deactivated')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('creator', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='web_app.engineer')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='accountstats',
+            constraint=models.UniqueConstraint(fields=('creator', 'marketplace', 'status'), name='account_stats_key'),
+        ),
+        migrations.RunPython(count_accounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web_app', '0009_account_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='lease expires at'),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='lease_holder',
+            field=models.CharField(blank=True, default='', max_length=150, verbose_name='lease holder'),
+        ),
+    ]
@@ -6,7 +6,9 @@ References:
     https://code.visualstudio.com/docs/python/tutorial-django (Accessed: 13 July 2023).
 """
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
 
@@ -21,6 +23,24 @@ class Engineer(models.Model):
 
     name = models.CharField(max_length=100)
 
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="engineer",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name"], name="engineer_name_idx"),
+        ]
+        constraints = [
+            # At most one engineer tests at a time; the partial unique index also serves the current-tester lookup.
+            models.UniqueConstraint(fields=["is_currently_testing"], condition=Q(is_currently_testing=True),
+                                    name="engineer_single_tester"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -76,4 +96,80 @@ class Account(models.Model):
         max_length=50
     )
 
-    creator = models.ForeignKey(Engineer, on_delete=models.CASCADE, blank=True)
\ No newline at end of file
+    creator = models.ForeignKey(Engineer, on_delete=models.CASCADE, blank=True, db_index=False)
+
+    modified = models.DateTimeField('date modified', auto_now=True, db_index=True)
+
+    # Set while an account is claimed (In use) through web_app.leases; cleared when it is released.
+    lease_holder = models.CharField(_('lease holder'), max_length=150, blank=True, default='')
+
+    lease_expires_at = models.DateTimeField(_('lease expires at'), blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created", "id"], name="account_created_id_idx"),
+            models.Index(fields=["creator", "created", "id"], name="account_creator_created_idx"),
+            models.Index(fields=["marketplace", "status", "created", "id"], name="account_market_status_idx"),
+            models.Index(fields=["marketplace", "created", "id"], name="account_market_created_idx"),
+            models.Index(fields=["status", "created", "id"], name="account_status_created_idx"),
+            models.Index(fields=["status", "lease_expires_at"], name="account_lease_expiry_idx"),
+        ]
+
+
+class AccountStats(models.Model):
+    """
+    The number of accounts per (marketplace, status, creator), kept current by web_app.stats in the transaction
+    of every account write, so totals are read from a handful of rows instead of counted from Account.
+    """
+
+    marketplace = models.CharField(max_length=50, choices=Account.Marketplace.choices)
+
+    status = models.CharField(max_length=50, choices=Account.Status.choices)
+
+    creator = models.ForeignKey(Engineer, on_delete=models.CASCADE, related_name="+", db_index=False)
+
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["creator", "marketplace", "status"], name="account_stats_key"),
+        ]
+
+
+class TestingSlot(models.Model):
+    """
+    The single row whose lock serializes testing status handoffs. Every handoff writes it first, so concurrent
+    handoffs queue on this row instead of racing on Engineer rows.
+    """
+
+    SINGLETON_ID = 1
+
+    engineer = models.OneToOneField(Engineer, blank=True, null=True, on_delete=models.SET_NULL, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(check=Q(id=1), name="testing_slot_singleton"),
+        ]
+
+    @classmethod
+    def hand_off(cls, engineer):
+        """Make engineer the only engineer currently testing, atomically."""
+        with transaction.atomic():
+            # The UPDATE takes the row lock (a write lock on SQLite) before any Engineer row is touched.
+            if not cls.objects.filter(pk=cls.SINGLETON_ID).update(engineer=engineer):
+                cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+                cls.objects.filter(pk=cls.SINGLETON_ID).update(engineer=engineer)
+            # Clear before setting: the unique constraint is checked row by row, so one CASE update could fail.
+            Engineer.objects.filter(is_currently_testing=True).exclude(pk=engineer.pk).update(
+                is_currently_testing=False)
+            Engineer.objects.filter(pk=engineer.pk).update(is_currently_testing=True)
+
+
+class LiveEvent(models.Model):
+    """Events waiting to be picked up by every worker's poller when live events are shared through the database."""
+
+    kind = models.CharField(max_length=50)
+
+    data = models.JSONField()
+
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
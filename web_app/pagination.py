@@ -0,0 +1,160 @@
+"""
+References:
+    KeysetPaginator based on the 'seek method' described in:
+
+    Winand, M. (2014) [online] We need tool support for keyset pagination, Use The Index, Luke. Available at:
+    https://use-the-index-luke.com/no-offset (Accessed: 18 October 2026).
+
+    EstimatedCountPaginator based on 'Count estimates' in the PostgreSQL wiki:
+
+    PostgreSQL (2023) [online] Count estimate. Available at:
+    https://wiki.postgresql.org/wiki/Count_estimate (Accessed: 18 October 2026).
+"""
+
+import base64
+import hashlib
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from web_app.cache import get_cache, get_generation
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset on (created, id) by seeking past the last row seen rather than using OFFSET, so every
+    page costs one index range scan no matter how deep into the table it is.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def page(self, after=None, before=None):
+        return self.build_page(list(self.page_queryset(after, before)), after, before)
+
+    async def apage(self, after=None, before=None):
+        return self.build_page([row async for row in self.page_queryset(after, before).aiterator()], after, before)
+
+    def page_queryset(self, after=None, before=None):
+        """Return the per_page + 1 rows following after, or preceding before in descending order."""
+        if before:
+            created, pk = self.decode_cursor(before)
+            queryset = self.object_list.filter(
+                Q(created__lt=created) | Q(created=created, id__lt=pk), created__lte=created
+            ).order_by("-created", "-id")
+            return queryset[:self.per_page + 1]
+
+        queryset = self.object_list.order_by("created", "id")
+        if after:
+            created, pk = self.decode_cursor(after)
+            queryset = queryset.filter(
+                Q(created__gt=created) | Q(created=created, id__gt=pk), created__gte=created
+            )
+        return queryset[:self.per_page + 1]
+
+    def build_page(self, rows, after=None, before=None):
+        has_more = len(rows) > self.per_page
+        if before:
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(rows,
+                              next_cursor=self.encode_cursor(rows[-1]) if rows else before,
+                              previous_cursor=self.encode_cursor(rows[0]) if has_more else None)
+        rows = rows[:self.per_page]
+        return KeysetPage(rows,
+                          next_cursor=self.encode_cursor(rows[-1]) if has_more else None,
+                          previous_cursor=self.encode_cursor(rows[0]) if after and rows else None)
+
+    @staticmethod
+    def encode_cursor(account):
+        value = f"{account.created.isoformat()}|{account.id}"
+        return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            created, pk = value.rsplit("|", 1)
+            created = parse_datetime(created)
+            pk = int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise Http404("Invalid page cursor.")
+        if created is None:
+            raise Http404("Invalid page cursor.")
+        return created, pk
+
+
+def estimated_row_count(model, using):
+    """Return PostgreSQL's planner estimate of model's row count, kept current by autovacuum and ANALYZE."""
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    # reltuples is -1 for a table that has never been vacuumed or analyzed.
+    return row[0] if row and row[0] >= 0 else None
+
+
+def cached_count(queryset):
+    """
+    Count queryset once per cache generation, for at most ADMIN_COUNT_CACHE_TIMEOUT seconds. Every Account and
+    Engineer write bumps the generation, so with a shared cache a cached count never outlives the rows it counted;
+    with a per-process one another worker's count can lag a write by up to the timeout, which an admin page
+    count can afford.
+    """
+    timeout = settings.ADMIN_COUNT_CACHE_TIMEOUT
+    if not timeout:
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+    key = f"count:{get_generation()}:{digest}"
+    count = get_cache().get(key)
+    if count is None:
+        count = queryset.count()
+        get_cache().set(key, count, timeout)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over large tables. An unfiltered PostgreSQL table past
+    ADMIN_COUNT_ESTIMATE_THRESHOLD rows is counted from pg_class.reltuples instead of a sequential scan;
+    every other count is exact but cached until the next write.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where and connections[queryset.db].vendor == "postgresql":
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+        return cached_count(queryset)
@@ -0,0 +1,156 @@
+"""
+References:
+    Query counting based on 'Database instrumentation' in Django documentation:
+
+    Django (2023) [online] Database instrumentation | Django documentation. Available at:
+    https://docs.djangoproject.com/en/4.1/topics/db/instrumentation/ (Accessed: 18 October 2026).
+
+    SQL fingerprints based on the query normalisation described in:
+
+    Percona (2023) [online] pt-fingerprint. Available at:
+    https://docs.percona.com/percona-toolkit/pt-fingerprint.html (Accessed: 18 October 2026).
+"""
+
+import asyncio
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from metrics import QUERY_BUDGET_OVERRUNS
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),
+    (re.compile(r"\s+"), " "),
+)
+
+# Fingerprints reported with an overrun, most repeated first; an N+1 shows up as one fingerprint many times.
+REPORTED_FINGERPRINTS = 5
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    """Reduce sql to its shape, so queries differing only in their parameters compare equal."""
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+# Savepoints are how atomic() nests inside a transaction, e.g. a test's; they are bookkeeping, not queries.
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.startswith(TRANSACTION_CONTROL):
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+def install_recorder(stack, recorder):
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        install_recorder(stack, recorder)
+        yield recorder
+
+
+def check_budget(view_name, budget, queries):
+    """Raise QueryBudgetExceeded when QUERY_BUDGET_RAISE is set, otherwise log and count the overrun."""
+    if len(queries) <= budget:
+        return
+    fingerprints = Counter(fingerprint(sql) for sql in queries).most_common(REPORTED_FINGERPRINTS)
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(
+            f"{view_name} executed {len(queries)} queries, budget is {budget}:\n"
+            + "\n".join(f"{count} x {sql}" for sql, count in fingerprints))
+    QUERY_BUDGET_OVERRUNS.labels(view_name).inc()
+    logger.warning("%s executed %s queries, budget is %s", view_name, len(queries), budget,
+                   extra={"event": "query_budget_exceeded", "view": view_name, "budget": budget,
+                          "queries": len(queries),
+                          "fingerprints": [{"sql": sql, "count": count} for sql, count in fingerprints]})
+
+
+def run_within_budget(view_name, budget, view, request, *args, **kwargs):
+    with record_queries() as recorder:
+        response = view(request, *args, **kwargs)
+        # Render template responses here, so the queries their templates trigger count against the view.
+        if not getattr(response, "is_rendered", True):
+            response.render()
+    check_budget(view_name, budget, recorder.queries)
+    return response
+
+
+async def arun_within_budget(view_name, budget, view, request, *args, **kwargs):
+    """
+    Async counterpart of run_within_budget. An async view's queries run in the request's thread-sensitive sync
+    thread, whose connections are not the event loop thread's, so the recorder is installed and removed there.
+    """
+    recorder = QueryRecorder()
+    stack = ExitStack()
+    await sync_to_async(install_recorder)(stack, recorder)
+    try:
+        response = await view(request, *args, **kwargs)
+        if not getattr(response, "is_rendered", True):
+            await sync_to_async(response.render)()
+    finally:
+        await sync_to_async(stack.close)()
+    check_budget(view_name, budget, recorder.queries)
+    return response
+
+
+def query_budget(budget):
+    """
+    Limit the queries a function view, including its template, may execute for any number of rows. Apply it
+    inside login_required so the session and user lookups are not counted. Async views are supported too.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                return await arun_within_budget(view.__name__, budget, view, request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return run_within_budget(view.__name__, budget, view, request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class QueryBudgetMixin:
+    """Class-based view counterpart of query_budget; list it after LoginRequiredMixin and set query_budget."""
+
+    query_budget = None
+
+    def get_query_budget(self):
+        if self.query_budget is None:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} is missing the query_budget attribute. Define "
+                f"{type(self).__name__}.query_budget, or override {type(self).__name__}.get_query_budget().")
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        return run_within_budget(type(self).__name__, self.get_query_budget(), super().dispatch, request, *args, **kwargs)
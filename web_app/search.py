@@ -0,0 +1,111 @@
+"""
+References:
+    SQLite search index based on 'External Content Tables' in the SQLite FTS5 documentation:
+
+    SQLite (2023) [online] SQLite FTS5 Extension. Available at:
+    https://www.sqlite.org/fts5.html#external_content_tables (Accessed: 18 October 2026).
+
+    PostgreSQL search index based on 'Preferred Index Types for Text Search' in the PostgreSQL documentation:
+
+    PostgreSQL (2023) [online] GIN and GiST Index Types. Available at:
+    https://www.postgresql.org/docs/current/textsearch-indexes.html (Accessed: 18 October 2026).
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+SQLITE_SEARCH_TABLE = "web_app_account_fts"
+
+SQLITE_SEARCH_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} "
+    f"USING fts5(ASIN, description, content='web_app_account', content_rowid='id')"
+)
+
+SQLITE_SEARCH_TRIGGERS_SQL = {
+    "web_app_account_fts_insert": (
+        f"CREATE TRIGGER IF NOT EXISTS web_app_account_fts_insert AFTER INSERT ON web_app_account BEGIN "
+        f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, ASIN, description) VALUES (new.id, new.ASIN, new.description); "
+        f"END"
+    ),
+    "web_app_account_fts_delete": (
+        f"CREATE TRIGGER IF NOT EXISTS web_app_account_fts_delete AFTER DELETE ON web_app_account BEGIN "
+        f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, ASIN, description) "
+        f"VALUES ('delete', old.id, old.ASIN, old.description); "
+        f"END"
+    ),
+    "web_app_account_fts_update": (
+        f"CREATE TRIGGER IF NOT EXISTS web_app_account_fts_update AFTER UPDATE OF ASIN, description "
+        f"ON web_app_account BEGIN "
+        f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, ASIN, description) "
+        f"VALUES ('delete', old.id, old.ASIN, old.description); "
+        f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, ASIN, description) VALUES (new.id, new.ASIN, new.description); "
+        f"END"
+    ),
+}
+
+POSTGRES_SEARCH_VECTOR = "to_tsvector('simple', \"web_app_account\".\"ASIN\" || ' ' || \"web_app_account\".\"description\")"
+
+POSTGRES_SEARCH_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS account_search_idx ON web_app_account "
+    "USING GIN (to_tsvector('simple', \"ASIN\" || ' ' || \"description\"))"
+)
+
+TERM_PATTERN = re.compile(r"\w+")
+
+
+def create_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(SQLITE_SEARCH_TABLE_SQL)
+            for sql in SQLITE_SEARCH_TRIGGERS_SQL.values():
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == "postgresql":
+            cursor.execute(POSTGRES_SEARCH_INDEX_SQL)
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for name in SQLITE_SEARCH_TRIGGERS_SQL:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_SEARCH_TABLE}")
+        elif connection.vendor == "postgresql":
+            cursor.execute("DROP INDEX IF EXISTS account_search_idx")
+
+
+def ensure_search_index(connection):
+    """
+    SQLite drops a table's triggers whenever a migration rebuilds it, so re-create any missing triggers and
+    rebuild the search table from web_app_account. Called after every migrate.
+    """
+    if connection.vendor != "sqlite" or SQLITE_SEARCH_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'web_app_account'")
+        existing = {name for name, in cursor.fetchall()}
+    if not existing.issuperset(SQLITE_SEARCH_TRIGGERS_SQL):
+        create_search_index(connection)
+
+
+def search_accounts(queryset, query):
+    """Restrict queryset to accounts whose ASIN or description contain words starting with every query term."""
+    terms = TERM_PATTERN.findall(query)
+    if not terms:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {SQLITE_SEARCH_TABLE} WHERE {SQLITE_SEARCH_TABLE} MATCH %s", [match]))
+    if vendor == "postgresql":
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        # Written out rather than built with SearchVector, whose COALESCEs would no longer match the index expression.
+        return queryset.filter(RawSQL(f"{POSTGRES_SEARCH_VECTOR} @@ to_tsquery('simple', %s)", [tsquery],
+                                      output_field=BooleanField()))
+    for term in terms:
+        queryset = queryset.filter(Q(ASIN__icontains=term) | Q(description__icontains=term))
+    return queryset
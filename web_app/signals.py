@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from web_app.cache import forget_current_tester, forget_user, invalidate_account_caches
+from web_app.events import publish_account_event
+from web_app.models import Account, Engineer
+from web_app.stats import KEY_FIELDS, apply_deltas, stats_key
+
+
+@receiver([post_save, post_delete], sender=Account)
+@receiver([post_save, post_delete], sender=Engineer)
+def invalidate_account_pages(sender, **kwargs):
+    invalidate_account_caches()
+
+
+@receiver([post_save, post_delete], sender=Engineer)
+def invalidate_current_tester(sender, **kwargs):
+    forget_current_tester()
+
+
+@receiver(post_save, sender=Account)
+def publish_account_saved(sender, instance, created, **kwargs):
+    publish_account_event("created" if created else "updated", id=instance.pk, ASIN=instance.ASIN)
+
+
+@receiver(post_delete, sender=Account)
+def publish_account_deleted(sender, instance, **kwargs):
+    publish_account_event("deleted", id=instance.pk, ASIN=instance.ASIN)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(post_init, sender=Account)
+def remember_stats_key(sender, instance, **kwargs):
+    # Rows loaded with only() or defer() leave the key unknown; pre_save then reads it before it is overwritten.
+    if instance.pk is not None and all(field in instance.__dict__ for field in KEY_FIELDS):
+        instance._stats_key = stats_key(instance)
+
+
+@receiver(pre_save, sender=Account)
+def load_stats_key(sender, instance, **kwargs):
+    if instance.pk is not None and not instance._state.adding and not hasattr(instance, "_stats_key"):
+        instance._stats_key = Account.objects.filter(pk=instance.pk).values_list(*KEY_FIELDS).first()
+
+
+@receiver(post_save, sender=Account)
+def count_account_saved(sender, instance, created, **kwargs):
+    old, new = None if created else getattr(instance, "_stats_key", None), stats_key(instance)
+    if old != new:
+        apply_deltas({new: 1} if old is None else {old: -1, new: 1})
+    instance._stats_key = new
+
+
+@receiver(post_delete, sender=Account)
+def count_account_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting an engineer cascades to its totals, so its accounts are not counted down (or back in as negatives).
+    if isinstance(origin, Engineer) or getattr(origin, "model", None) is Engineer:
+        return
+    apply_deltas({getattr(instance, "_stats_key", None) or stats_key(instance): -1})
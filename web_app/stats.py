@@ -0,0 +1,110 @@
+"""
+References:
+    Summary table maintained by deltas based on 'Summary Tables' in:
+
+    Schwartz, B., Zaitsev, P. and Tkachenko, V. (2012) High Performance MySQL. 3rd edn. Sebastopol: O'Reilly,
+    Chapter 4: Cache and Summary Tables.
+
+    Counter upserts based on INSERT ... ON CONFLICT DO UPDATE in the PostgreSQL and SQLite documentation:
+
+    PostgreSQL (2023) [online] INSERT — ON CONFLICT Clause. Available at:
+    https://www.postgresql.org/docs/current/sql-insert.html#SQL-ON-CONFLICT (Accessed: 18 October 2026).
+
+    SQLite (2023) [online] UPSERT. Available at: https://www.sqlite.org/lang_upsert.html
+    (Accessed: 18 October 2026).
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Sum
+
+from web_app.cache import get_cache, get_generation
+from web_app.models import Account, AccountStats
+
+KEY_FIELDS = ("creator_id", "marketplace", "status")
+
+TOTALS_KEY = "accounts:totals:{}:{}"
+
+UPSERT_BATCH_SIZE = 200
+
+
+def stats_key(account):
+    return tuple(getattr(account, field) for field in KEY_FIELDS)
+
+
+def count_keys(queryset):
+    """Return a Counter of accounts in queryset per (creator_id, marketplace, status), counted with one query."""
+    rows = queryset.order_by().values_list(*KEY_FIELDS).annotate(count=Count("id"))
+    return Counter({tuple(key): count for *key, count in rows})
+
+
+def apply_deltas(deltas):
+    """
+    Add deltas, a mapping of (creator_id, marketplace, status) to a change in count, to AccountStats with one
+    upsert per UPSERT_BATCH_SIZE keys, which inserts missing rows and increments existing ones atomically, so
+    concurrent writers neither lose an increment nor race to insert. Call it inside the transaction that changed
+    the accounts, so the counts commit or roll back with them.
+    """
+    deltas = sorted((key, delta) for key, delta in deltas.items() if delta)
+    if not deltas:
+        return
+    quote = connection.ops.quote_name
+    table = quote(AccountStats._meta.db_table)
+    key_columns = ", ".join(quote(AccountStats._meta.get_field(field).column) for field in KEY_FIELDS)
+    count = quote("count")
+    with connection.cursor() as cursor:
+        # Keys are written in sorted order so two transactions lock shared rows in the same order.
+        for offset in range(0, len(deltas), UPSERT_BATCH_SIZE):
+            batch = deltas[offset:offset + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({key_columns}, {count}) VALUES {', '.join(['(%s, %s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({key_columns}) DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}",
+                [value for key, delta in batch for value in (*key, delta)])
+
+
+def rebuild_stats():
+    """
+    Recount AccountStats from Account and return the drift that was corrected, as a dict of
+    (creator_id, marketplace, status) to the stored count minus the true count. Run it inside a transaction that
+    keeps accounts from being written meanwhile, or a write between the recount and the replace is lost.
+    """
+    actual = count_keys(Account.objects.all())
+    stored = Counter({stats_key(row): row.count for row in AccountStats.objects.all()})
+    drift = {key: stored[key] - actual[key] for key in stored.keys() | actual.keys() if stored[key] != actual[key]}
+    if drift:
+        AccountStats.objects.all().delete()
+        AccountStats.objects.bulk_create(
+            [AccountStats(count=count, **dict(zip(KEY_FIELDS, key))) for key, count in actual.items()],
+            batch_size=1000)
+    return drift
+
+
+def account_totals(user_id=None):
+    """
+    Return the number of accounts, by status, by marketplace and overall, created by one user's engineer or by
+    everyone, read from AccountStats with one query and cached under the account cache generation.
+    """
+    timeout = settings.ACCOUNT_LIST_CACHE_TIMEOUT
+    if timeout:
+        cache_key = TOTALS_KEY.format(get_generation(), "all" if user_id is None else user_id)
+        totals = get_cache().get(cache_key)
+        if totals is not None:
+            return totals
+
+    queryset = AccountStats.objects.all()
+    if user_id is not None:
+        queryset = queryset.filter(creator__user_id=user_id)
+    by_status, by_marketplace = Counter(), Counter()
+    for marketplace, status, count in queryset.values_list("marketplace", "status").annotate(count=Sum("count")):
+        by_status[status] += count
+        by_marketplace[marketplace] += count
+    totals = {
+        "total": sum(by_status.values()),
+        "by_status": [(label, by_status[value]) for value, label in Account.Status.choices],
+        "by_marketplace": [(label, by_marketplace[value]) for value, label in Account.Marketplace.choices],
+    }
+    if timeout:
+        get_cache().set(cache_key, totals, timeout)
+    return totals
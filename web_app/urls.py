@@ -1,20 +1,41 @@
+from django.conf import settings
 from django.urls import path, re_path
 
-from web_app import views
+from web_app import api, async_views, views
 
-account_list_view = views.AccountListView.as_view(template_name="web_app/accounts.html")
-user_account_list_view = views.AccountListView.as_view(template_name="web_app/user_accounts.html")
-delete_account_list_view = views.AccountDeleteView.as_view(template_name="web_app/delete_account_form.html")
 
-urlpatterns = [
-    re_path(r'^accounts/update/(?P<pk>\d)/$', views.edit_account_request, name="edit_account"),
-    re_path(r'^accounts/delete/(?P<pk>\d)/$', delete_account_list_view, name="delete_account"),
-    path("", views.home_request, name="home"),
-    path("accounts/", account_list_view, name="accounts"),
-    path("user_accounts/", user_account_list_view, name="user_accounts"),
-    path("set_testing_status/", views.set_testing_status_request, name="set_testing_status"),
-    path("create_account_form/", views.create_account_request, name="create_account_form"),
-    path("register_eng_form/", views.register_eng_request, name="register_eng_form"),
-    path("login/", views.login_request, name="login"),
-    path("logout/", views.logout_request, name="logout"),
-]
\ No newline at end of file
+def get_urlpatterns(async_reads=False):
+    """Return the app's routes, with the read-heavy ones served by web_app.async_views when async_reads is set."""
+    list_view_class = async_views.AsyncAccountListView if async_reads else views.AccountListView
+    read_views = async_views if async_reads else views
+    read_api = async_views if async_reads else api
+
+    account_list_view = list_view_class.as_view(template_name="web_app/accounts.html")
+    user_account_list_view = list_view_class.as_view(template_name="web_app/user_accounts.html")
+    delete_account_list_view = views.AccountDeleteView.as_view(template_name="web_app/delete_account_form.html")
+
+    return [
+        re_path(r'^accounts/update/(?P<pk>\d+)/$', views.edit_account_request, name="edit_account"),
+        re_path(r'^accounts/delete/(?P<pk>\d+)/$', delete_account_list_view, name="delete_account"),
+        path("", read_views.home_request, name="home"),
+        path("accounts/", account_list_view, name="accounts"),
+        path("accounts/export/", views.export_accounts_request, name="export_accounts"),
+        path("accounts/import/", views.import_accounts_request, name="import_accounts"),
+        path("accounts/bulk/", views.bulk_update_accounts_request, name="bulk_update_accounts"),
+        path("user_accounts/", user_account_list_view, name="user_accounts"),
+        path("set_testing_status/", views.set_testing_status_request, name="set_testing_status"),
+        path("create_account_form/", views.create_account_request, name="create_account_form"),
+        path("register_eng_form/", views.register_eng_request, name="register_eng_form"),
+        path("login/", views.login_request, name="login"),
+        path("logout/", views.logout_request, name="logout"),
+        path("api/accounts/", read_api.account_list_api, name="api_accounts"),
+        path("api/accounts/<int:pk>/", read_api.account_detail_api, name="api_account"),
+        path("api/accounts/claim/", api.claim_account_api, name="api_claim_account"),
+        path("api/accounts/<int:pk>/release/", api.release_account_api, name="api_release_account"),
+        path("api/testing_status/", read_api.current_tester_api, name="api_testing_status"),
+        path("metrics", views.metrics_request, name="metrics"),
+        path("events/", views.events_request, name="events"),
+    ]
+
+
+urlpatterns = get_urlpatterns(settings.ASYNC_READ_VIEWS)
@@ -23,70 +23,185 @@ References:
     Available at: https://stackoverflow.com/a/52494854 (Accessed: 15 July 2023).
 """
 
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.contrib.messages import get_messages
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.views.generic import ListView, DeleteView
-from django.contrib.auth import login, authenticate, get_user, logout
+from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 
-from web_app.forms import CreateAccountForm, RegisterEngineerForm, EditAccountForm, SetTestingStatusForm
-from web_app.models import Account, Engineer
+import login_throttle
+from metrics import render_metrics
+from web_app.bulk import update_status
+from web_app.cache import account_page_cache_key, get_cache, invalidate_account_caches, refresh_current_tester
+from web_app.events import publish_testing_status
+from web_app.export import EXPORT_FORMATS, export_accounts
+from web_app.forms import (AccountFilterForm, AccountScopeForm, BulkStatusForm, CreateAccountForm,
+                           RegisterEngineerForm, EditAccountForm, ImportAccountsForm, SetTestingStatusForm)
+from web_app.importer import UNREADABLE_FILE_ERRORS, import_accounts, read_csv
+from web_app.models import Account, TestingSlot
+from web_app.pagination import KeysetPaginator
+from web_app.query_budget import QueryBudgetMixin, query_budget
+from web_app.stats import account_totals
 
 
-class AccountListView(LoginRequiredMixin, ListView):
+class AccountListView(LoginRequiredMixin, QueryBudgetMixin, ListView):
     login_url = "login"
     model = Account
     context_object_name = "account_list"
+    paginate_by = 50
+    paginator_class = KeysetPaginator
+    query_budget = 5
+
+    def get(self, request, *args, **kwargs):
+        cache_key = self.get_cache_key()
+        if cache_key is not None:
+            content = get_cache().get(cache_key)
+            if content is not None:
+                return HttpResponse(content)
+        response = super(AccountListView, self).get(request, *args, **kwargs)
+        if cache_key is not None:
+            response.add_post_render_callback(lambda rendered: self.cache_response(cache_key, rendered))
+        return response
+
+    def get_cache_key(self):
+        # Pending messages are rendered into the page, so those responses are neither served from nor stored in
+        # the cache. The per-user list and the superuser-only delete links are cached per variant.
+        if not settings.ACCOUNT_LIST_CACHE_TIMEOUT or get_messages(self.request):
+            return None
+        if self.request.path == "/user_accounts/":
+            variant = f"user-{self.request.user.pk}"
+        else:
+            variant = "superuser" if self.request.user.is_superuser else "user"
+        return account_page_cache_key(self.request, variant)
+
+    @staticmethod
+    def cache_response(cache_key, response):
+        if response.status_code == 200:
+            get_cache().set(cache_key, response.content, settings.ACCOUNT_LIST_CACHE_TIMEOUT)
 
     def get_context_data(self, **kwargs):
         context = super(AccountListView, self).get_context_data(**kwargs)
-        context["testing_status"] = Engineer.objects.filter(is_currently_testing=True)
+        context["filter_form"] = self.filter_form
+        query = self.request.GET.copy()
+        query.pop("after", None)
+        query.pop("before", None)
+        context["filter_query"] = query.urlencode()
+        # Passed uncalled so the totals are read while rendering, which the async subclass does in the sync thread.
+        if self.request.path == "/user_accounts/":
+            context["account_totals"] = partial(account_totals, user_id=self.request.user.pk)
+        else:
+            context["account_totals"] = account_totals
         return context
 
     def get_queryset(self):
         if self.request.path == "/user_accounts/":
-            user = get_user(self.request)
-            return Account.objects.filter(creator__name=user.get_full_name())
-        return Account.objects.all()
+            queryset = Account.objects.filter(creator__user=self.request.user)
+        else:
+            queryset = Account.objects.all()
+        self.filter_form = AccountFilterForm(self.request.GET)
+        self.filter_form.is_valid()
+        queryset = self.filter_form.filter_queryset(queryset)
+        return queryset.select_related("creator").only(
+            "id", "created", "ASIN", "marketplace", "description", "status", "creator__name")
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        page = paginator.page(after=self.request.GET.get("after"), before=self.request.GET.get("before"))
+        return paginator, page, page.object_list, page.has_other_pages()
 
-class AccountDeleteView(PermissionRequiredMixin, DeleteView):
+
+class AccountDeleteView(PermissionRequiredMixin, QueryBudgetMixin, DeleteView):
     permission_required = "user.is_superuser"
     model = Account
     context_object_name = "delete_account_form"
+    query_budget = 3
+
+    @transaction.atomic
+    def form_valid(self, form):
+        return super(AccountDeleteView, self).form_valid(form)
 
     def get_success_url(self):
         messages.info(self.request, "Account successfully deleted.")
         return reverse_lazy("accounts")
 
 
+@query_budget(3)
 def home_request(request):
-    return render(request, "web_app/home.html")
+    return render(request, "web_app/home.html", {"account_totals": account_totals})
 
 
 @login_required(login_url="login")
+@query_budget(4)
 def create_account_request(request):
     form = CreateAccountForm(request.POST or None)
     if request.method == "POST":
+        if form.is_valid() and not request.engineer:
+            # Every account needs a creator, so without one the insert would fail on the NOT NULL constraint.
+            form.add_error(None, "Only users with an engineer profile can create accounts.")
         if form.is_valid():
             account = form.save(commit=False)
             account.created = timezone.now()
-            user = get_user(request)
-            creator = Engineer.objects.filter(name=user.get_full_name())
-            if creator.count() != 0:
-                account.creator = creator[0]
-            account.save()
+            account.creator = request.engineer
+            with transaction.atomic():
+                account.save()
             messages.info(request, f"Account {account.ASIN} has been created.")
             return redirect("accounts")
         messages.error(request, "Form is not valid.")
     return render(request, "web_app/create_account_form.html", {"create_account_form": form})
 
 
+# No query budget: an import runs a lookup and an insert per batch, so its queries grow with the file.
+@login_required(login_url="login")
+def import_accounts_request(request):
+    form = ImportAccountsForm(request.POST or None, request.FILES or None)
+    result = None
+    if request.method == "POST":
+        if not request.engineer:
+            messages.error(request, "Only users with an engineer profile can import accounts.")
+        elif form.is_valid():
+            try:
+                result = import_accounts(read_csv(form.cleaned_data["file"]), request.engineer,
+                                         form.cleaned_data["batch_size"])
+            except UNREADABLE_FILE_ERRORS as error:
+                form.add_error("file", f"The file could not be read as UTF-8 CSV: {error}")
+                messages.error(request, "Form is not valid.")
+            else:
+                messages.info(request, f"Imported {result.created} accounts ({result.rows_per_second:.0f} rows/sec).")
+                if result.errors:
+                    messages.error(request, f"{len(result.errors)} rows could not be imported.")
+        else:
+            messages.error(request, "Form is not valid.")
+    return render(request, "web_app/import_accounts_form.html", {"import_accounts_form": form, "result": result})
+
+
+# The export is streamed after the view returns, so the view itself only validates the creator filter.
+@login_required(login_url="login")
+@query_budget(1)
+def export_accounts_request(request):
+    export_format = request.GET.get("format", "csv")
+    form = AccountFilterForm(request.GET)
+    if export_format not in EXPORT_FORMATS or not form.is_valid():
+        return HttpResponseBadRequest("Invalid export format or filters.")
+    content_type, _ = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(export_accounts(form.filter_queryset(Account.objects.all()), export_format),
+                                     content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="accounts.{export_format}"'
+    return response
+
+
 @login_required(login_url="login")
+@query_budget(4)
 def edit_account_request(request, pk):
     try:
         instance = Account.objects.get(pk=pk)
@@ -96,7 +211,8 @@ def edit_account_request(request, pk):
     form = EditAccountForm(data=request.POST or None, instance=instance)
     if request.method == "POST":
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
             messages.info(request, "Account successfully updated.")
             return redirect("accounts")
         messages.error(request, "Form is not valid.")
@@ -104,6 +220,28 @@ def edit_account_request(request, pk):
                   context={"edit_account_form": form, "instance": instance})
 
 
+@login_required(login_url="login")
+@query_budget(4)
+def bulk_update_accounts_request(request):
+    # The scope comes from the query string, so the account list links here with its filters or selected ids.
+    scope = AccountScopeForm(request.GET)
+    if not scope.is_valid():
+        return HttpResponseBadRequest("Invalid filters or account ids.")
+    # Staff may update anyone's accounts; everyone else only the accounts their engineer created.
+    visible = Account.objects.all() if request.user.is_staff else Account.objects.filter(creator__user=request.user)
+    queryset = scope.scope_queryset(visible)
+    form = BulkStatusForm(request.POST or None)
+    if request.method == "POST":
+        if form.is_valid():
+            updated = update_status(queryset, form.cleaned_data["status"])
+            messages.info(request, f"{updated} accounts set to {Account.Status(form.cleaned_data['status']).label}.")
+            return redirect("accounts")
+        messages.error(request, "Form is not valid.")
+    return render(request, "web_app/bulk_update_accounts.html",
+                  {"bulk_status_form": form, "count": queryset.count(), "scope_query": request.GET.urlencode()})
+
+
+@query_budget(8)
 def register_eng_request(request):
     form = RegisterEngineerForm(request.POST or None)
     if request.method == "POST":
@@ -116,22 +254,37 @@ def register_eng_request(request):
     return render (request, "web_app/register_eng_form.html", {"register_eng_form":form})
 
 
+def throttled_login_response(request, wait):
+    messages.error(request, "Too many failed login attempts. Please try again later.")
+    response = render(request, "web_app/login.html", {"login_form": AuthenticationForm(request)}, status=429)
+    response["Retry-After"] = str(wait)
+    return response
+
+
+@query_budget(7)
 def login_request(request):
     form = AuthenticationForm(request, data=request.POST or None)
     if request.method == "POST":
+        # Refuse throttled clients before the form authenticates, so they never cost a password hash.
+        wait = login_throttle.retry_after(request, request.POST.get("username"))
+        if wait:
+            return throttled_login_response(request, wait)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                messages.info(request, f"You are now logged in as {username}.")
-                return redirect("accounts")
+            # The form has already authenticated the user; authenticating again would hash the password twice.
+            user = form.get_user()
+            login(request, user)
+            messages.info(request, f"You are now logged in as {user.get_username()}.")
+            return redirect("accounts")
+        # The backend checks the throttle again and may refuse an attempt that raced past the check above.
+        wait = login_throttle.throttled_for(request)
+        if wait:
+            return throttled_login_response(request, wait)
         messages.error(request,"Invalid username or password.")
     return render(request, "web_app/login.html", {"login_form":form})
 
 
 @login_required(login_url="login")
+@query_budget(2)
 def logout_request(request):
     logout(request)
     messages.info(request, "You have successfully logged out.")
@@ -139,15 +292,34 @@ def logout_request(request):
 
 
 @login_required(login_url="login")
+@query_budget(7)
 def set_testing_status_request(request):
     form = SetTestingStatusForm(request.POST or None)
     if request.method == "POST":
         if form.is_valid():
-            engineer_id = form.cleaned_data.get("engineer").id
-            Engineer.objects.filter(is_currently_testing=True).update(is_currently_testing=False)
-            engineer = Engineer.objects.get(pk=engineer_id)
-            engineer.is_currently_testing = True
-            engineer.save(update_fields=["is_currently_testing"])
+            engineer = form.cleaned_data.get("engineer")
+            TestingSlot.hand_off(engineer)
+            # The handoff updates rows in bulk, which sends no post_save signals.
+            invalidate_account_caches()
+            refresh_current_tester()
+            publish_testing_status(engineer)
             messages.info(request, f"Testing status transferred to {engineer.name}.")
             return redirect("accounts")
-    return render(request, "web_app/set_testing_status.html", {"set_testing_status": form})
\ No newline at end of file
+    return render(request, "web_app/set_testing_status.html", {"set_testing_status": form})
+
+
+@query_budget(0)
+def metrics_request(request):
+    # Scrapers authenticate with a bearer token when METRICS_TOKEN is set; compare in constant time.
+    if settings.METRICS_TOKEN and not constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"):
+        return HttpResponse(status=401)
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+@query_budget(0)
+def events_request(request):
+    # Live events are streamed by web_app.events.events_app under ASGI. Reaching Django means the site is
+    # served over WSGI, and 204 tells EventSource clients to stop reconnecting.
+    return HttpResponse(status=204)
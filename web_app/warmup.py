@@ -0,0 +1,82 @@
+"""
+References:
+    Server hooks based on the 'Server Hooks' section of the Gunicorn documentation:
+
+    Gunicorn (2023) [online] Settings — Server Hooks. Available at:
+    https://docs.gunicorn.org/en/stable/settings.html#server-hooks (Accessed: 18 October 2026).
+
+    Template compilation based on the cached template loader in Django documentation:
+
+    Django (2023) [online] The Django template language: for Python programmers. Available at:
+    https://docs.djangoproject.com/en/4.1/ref/templates/api/#django.template.loaders.cached.Loader
+    (Accessed: 18 October 2026).
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import NoReverseMatch, get_resolver, reverse
+
+TEMPLATE_DIRECTORY = "web_app"
+
+
+def compile_templates():
+    """Load every template under templates/web_app into the cached loader; return how many were compiled."""
+    root = os.path.join(settings.BASE_DIR, "templates")
+    count = 0
+    for directory, _, files in os.walk(os.path.join(root, TEMPLATE_DIRECTORY)):
+        for file in sorted(files):
+            if file.endswith(".html"):
+                get_template(os.path.relpath(os.path.join(directory, file), root).replace(os.sep, "/"))
+                count += 1
+    return count
+
+
+def resolve_urls(resolver=None, namespace=""):
+    """Populate the URL resolvers and reverse every named route; return how many names were reversed."""
+    resolver = resolver or get_resolver()
+    count = 0
+    for name in list(resolver.reverse_dict):
+        if not isinstance(name, str):
+            continue
+        for possibilities, *_ in resolver.reverse_dict.getlist(name):
+            for _, params in possibilities:
+                try:
+                    reverse(namespace + name, kwargs=dict.fromkeys(params, "1"))
+                except NoReverseMatch:
+                    # A parameter restricted to other values (e.g. the admin's app labels); populating is what counts.
+                    continue
+                count += 1
+    for child, (_, sub_resolver) in resolver.namespace_dict.items():
+        count += resolve_urls(sub_resolver, f"{namespace}{child}:")
+    return count
+
+
+def check_connections():
+    """
+    Connect to every database and close the connection again; return how many were reached. Requests do not run
+    their queries in the thread that calls this (the ASGI handler gives each request a sync thread of its own), so
+    a connection left open here would only sit idle; what this buys is failing at startup rather than on the first
+    request when a database is unreachable.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+        connection.close()
+    return len(connections.all())
+
+
+def warm_up(database=True):
+    """
+    Do the work a worker would otherwise do on its first requests and return what was done with its duration.
+    Templates and URLs can be warmed in a preloading master and inherited by its workers; database
+    connections cannot survive fork(), so the databases are checked from each worker.
+    """
+    start = time.perf_counter()
+    report = {"templates": compile_templates(), "urls": resolve_urls()}
+    if database:
+        report["databases"] = check_connections()
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
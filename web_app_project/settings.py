@@ -50,11 +50,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'middleware.MetricsMiddleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'middleware.EngineerMiddleware.EngineerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -65,7 +67,7 @@ ROOT_URLCONF = 'web_app_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,6 +76,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'web_app.context_processors.testing_status',
             ],
         },
     },
@@ -95,6 +98,131 @@ DATABASES = {
 
 DATABASES['default'].update(db_from_env)
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# LocMemCache evicts least recently used entries once MAX_ENTRIES is reached; point CACHE_BACKEND and
+# CACHE_LOCATION at a shared backend (e.g. Redis or Memcached) to share entries between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='web-app-project'),
+    },
+}
+
+if CACHES['default']['BACKEND'].endswith('LocMemCache'):
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=1000, cast=int)}
+
+# Sessions, authenticated users, account pages and the testing status are served from the cache only when it is
+# shared between workers: with a per-process LocMemCache an invalidation reaches only the worker that made it, so
+# the others would keep serving a session, user, page or tester that has since changed. A timeout of 0 disables
+# that cache.
+
+SHARED_CACHE = not CACHES['default']['BACKEND'].endswith('LocMemCache')
+
+ACCOUNT_LIST_CACHE_ALIAS = config('ACCOUNT_LIST_CACHE_ALIAS', default='default')
+
+ACCOUNT_LIST_CACHE_TIMEOUT = config('ACCOUNT_LIST_CACHE_TIMEOUT', default=300 if SHARED_CACHE else 0, cast=int)
+
+TESTING_STATUS_CACHE_TIMEOUT = config('TESTING_STATUS_CACHE_TIMEOUT', default=300 if SHARED_CACHE else 0, cast=int)
+
+# Unfiltered admin changelists over PostgreSQL tables with at least this many rows show the planner's row estimate.
+
+ADMIN_COUNT_ESTIMATE_THRESHOLD = config('ADMIN_COUNT_ESTIMATE_THRESHOLD', default=100000, cast=int)
+
+# Seconds admin changelist counts are cached. Unlike a page, a count that is briefly stale is harmless, so they are
+# cached even when the cache is per process; 0 counts every time.
+
+ADMIN_COUNT_CACHE_TIMEOUT = config('ADMIN_COUNT_CACHE_TIMEOUT', default=300 if SHARED_CACHE else 60, cast=int)
+
+SESSION_ENGINE = config('SESSION_ENGINE',
+                        default='session_store' if SHARED_CACHE else 'django.contrib.sessions.backends.db')
+
+SESSION_CACHE_ALIAS = config('SESSION_CACHE_ALIAS', default='default')
+
+# Seconds a session change may live only in the cache before the next save also writes it to the database.
+# Logins and logouts are always written through; 0 writes every save through, as cached_db does.
+
+SESSION_WRITE_BEHIND_INTERVAL = config('SESSION_WRITE_BEHIND_INTERVAL', default=60, cast=int)
+
+# Seconds AuthenticationFailureLoggerModelBackend caches the user of a session; 0 loads it on every request.
+
+AUTH_USER_CACHE_ALIAS = config('AUTH_USER_CACHE_ALIAS', default='default')
+
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300 if SHARED_CACHE else 0, cast=int)
+
+# Messages travel in a signed cookie, so adding one does not save the session.
+
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Failed logins allowed per username and per client IP within a sliding window of LOGIN_THROTTLE_WINDOW seconds.
+# The counters live in the LOGIN_THROTTLE_CACHE_ALIAS cache. Unless it is shared (see SHARED_CACHE), each worker
+# counts on its own, so the limits apply per worker; the system checks warn about this (login_throttle.W001).
+
+LOGIN_THROTTLE_CACHE_ALIAS = config('LOGIN_THROTTLE_CACHE_ALIAS', default='default')
+
+LOGIN_THROTTLE_WINDOW = config('LOGIN_THROTTLE_WINDOW', default=300, cast=int)
+
+LOGIN_THROTTLE_USERNAME_LIMIT = config('LOGIN_THROTTLE_USERNAME_LIMIT', default=5, cast=int)
+
+LOGIN_THROTTLE_IP_LIMIT = config('LOGIN_THROTTLE_IP_LIMIT', default=20, cast=int)
+
+# Behind reverse proxies (e.g. Heroku's router) REMOTE_ADDR is the nearest proxy's address, so every client would
+# share one IP throttle. Set CLIENT_IP_HEADER to the request.META key the proxies append the client address to and
+# CLIENT_IP_TRUSTED_PROXIES to how many of them there are. Only set these when every request comes through the
+# proxies, since a client can send the header itself.
+
+CLIENT_IP_HEADER = config('CLIENT_IP_HEADER', default='')
+
+CLIENT_IP_TRUSTED_PROXIES = config('CLIENT_IP_TRUSTED_PROXIES', default=1, cast=int)
+
+# Bearer token required to scrape /metrics; leave empty to serve metrics without authentication.
+
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Raise QueryBudgetExceeded when a view runs more queries than its budget; otherwise overruns are logged and
+# counted. The test suite turns it on for its own test cases.
+
+QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=False, cast=bool)
+
+# Live events (/events/, served under ASGI). With LIVE_EVENTS off nothing is published, so writes skip the events
+# table; web_app_project.wsgi turns it off by default, since nothing streams events under WSGI, and a WSGI site should
+# turn it off for the reaper too. LIVE_EVENTS_POLL_INTERVAL is the seconds between polls of the shared events table,
+# which carries events between the gunicorn workers and the reaper process. 0 fans events out within the publishing
+# process only, which is only right when a single process both writes and streams, e.g. runserver.
+
+LIVE_EVENTS = config('LIVE_EVENTS', default=True, cast=bool)
+
+LIVE_EVENTS_POLL_INTERVAL = config('LIVE_EVENTS_POLL_INTERVAL', default=1.0, cast=float)
+
+# Seconds events are kept in the shared table; publishers delete older ones.
+
+LIVE_EVENTS_RETENTION = config('LIVE_EVENTS_RETENTION', default=300, cast=int)
+
+LIVE_EVENTS_KEEPALIVE = config('LIVE_EVENTS_KEEPALIVE', default=15, cast=int)
+
+LIVE_EVENTS_RETRY_MS = config('LIVE_EVENTS_RETRY_MS', default=5000, cast=int)
+
+# Seconds an account claimed through the lease API stays In use before it may be reclaimed, unless the claim asks
+# for another duration of at most ACCOUNT_LEASE_MAX_SECONDS.
+
+ACCOUNT_LEASE_SECONDS = config('ACCOUNT_LEASE_SECONDS', default=900, cast=int)
+
+ACCOUNT_LEASE_MAX_SECONDS = config('ACCOUNT_LEASE_MAX_SECONDS', default=86400, cast=int)
+
+# The lease reaper runs in a process of its own, on a host of its own on Heroku, so it exposes its metrics itself:
+# served on REAPER_METRICS_PORT for Prometheus to scrape, or pushed after every pass to the Pushgateway at
+# REAPER_PUSHGATEWAY, which suits dynos that cannot be scraped. 0 and '' turn them off.
+
+REAPER_METRICS_PORT = config('REAPER_METRICS_PORT', default=0, cast=int)
+
+REAPER_PUSHGATEWAY = config('REAPER_PUSHGATEWAY', default='')
+
+# Serve the account list, the JSON read API and the home page from web_app.async_views; web_app_project.asgi
+# turns this on unless the environment says otherwise.
+
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -143,18 +271,33 @@ STATICFILES_DIRS = (
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Records are queued on the calling thread and written as JSON lines by a background listener, so request
+# latency does not depend on log I/O. Records arriving while the queue is full are dropped and counted.
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
-        'console': {
+        'queue': {
             'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
+            'class': 'queue_logging.BoundedQueueHandler',
+            'maxsize': config('LOG_QUEUE_SIZE', default=10000, cast=int),
         },
     },
     'root': {
-        'handlers': ['console'],
-        'level': 'DEBUG',
+        'handlers': ['queue'],
+        'level': config('LOG_LEVEL', default='INFO'),
+    },
+    'loggers': {
+        'authentication_failure_logger': {
+            'level': config('AUTHENTICATION_FAILURE_LOG_LEVEL', default='WARNING'),
+        },
+        'sql_injection': {
+            'level': config('SQL_INJECTION_LOG_LEVEL', default='WARNING'),
+        },
+        'django.db.backends': {
+            'level': config('DB_LOG_LEVEL', default='INFO'),
+        },
     },
 }
 
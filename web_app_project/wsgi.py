@@ -12,5 +12,6 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'web_app_project.settings')
+os.environ.setdefault('LIVE_EVENTS', 'False')
 
 application = get_wsgi_application()